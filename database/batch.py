@@ -0,0 +1,110 @@
+from datetime import date, datetime
+from decimal import Decimal
+import json
+
+from sqlalchemy import Date, DateTime, Float, Numeric, Text, cast, func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from database.dialect import dialect_name
+
+# Batched execution of the report fetchers. A fetcher is a generator that yields a
+# list of queries and is sent back the list of their rows, e.g.
+#   done_rows, priority_rows = yield [done, priority]
+# and returns its result. run_queries() executes each list as it comes;
+# run_batched() advances every fetcher together, so all the queries of one step
+# go to the database in a single round trip. Both take an optional executor
+# (list of queries -> list of rows), e.g. database.shard.ShardExecutor.
+
+def run_queries(fetcher, execute=None):
+    # One query at a time, as before batching
+    execute = execute or (lambda queries: [query.all() for query in queries])
+    try:
+        queries = next(fetcher)
+        while True:
+            try:
+                rows = execute(queries)
+            except Exception as e:
+                # Let the fetcher's own error handling deal with it
+                queries = fetcher.throw(e)
+                continue
+            queries = fetcher.send(rows)
+    except StopIteration as stop:
+        return stop.value
+
+def run_batched(fetchers, session, execute=None):
+    # fetchers: {name: generator}; returns {name: result}
+    execute = execute or batch_executor(session)
+    pending, results = {}, {}
+
+    def step(name, advance):
+        try:
+            pending[name] = advance()
+        except StopIteration as stop:
+            results[name] = stop.value
+
+    for name, fetcher in fetchers.items():
+        step(name, fetcher.__next__)
+
+    while pending:
+        batch, pending = pending, {}
+        try:
+            rows = execute([query for queries in batch.values() for query in queries])
+        except Exception as e:
+            # Let each fetcher's own error handling deal with it
+            session.rollback()
+            for name, queries in batch.items():
+                step(name, lambda: fetchers[name].throw(e))
+            continue
+
+        offset = 0
+        for name, queries in batch.items():
+            step(name, lambda: fetchers[name].send(rows[offset:offset + len(queries)]))
+            offset += len(queries)
+    return results
+
+def batch_executor(session):
+    if dialect_name(session) != "postgresql":
+        # Local databases (SQLite) have no round trip worth saving
+        return lambda queries: [session.execute(query.statement).all() for query in queries]
+    return lambda queries: execute_json_batch(session, queries)
+
+def json_decoder(column_type):
+    # JSON carries dates, timestamps and numerics as strings/numbers; turn them back
+    # into the values psycopg2 returns for the column's type
+    if isinstance(column_type, DateTime):
+        return datetime.fromisoformat
+    if isinstance(column_type, Date):
+        return date.fromisoformat
+    if isinstance(column_type, Float):
+        return float
+    if isinstance(column_type, Numeric):
+        return Decimal
+    return None
+
+def decode_json_rows(rows, decoders):
+    if not any(decoders):
+        return [tuple(row) for row in rows]
+    return [tuple(value if decode is None or value is None else decode(value)
+                  for decode, value in zip(decoders, row))
+            for row in rows]
+
+def execute_json_batch(session, queries):
+    # One statement with a scalar subquery per query, each returning its rows as a
+    # JSON array of arrays (in the query's column order), decoded per column type.
+    # Aggregate input order isn't the subquery's ORDER BY, so each row carries its
+    # position under that ORDER BY and json_agg is ordered by it.
+    columns, decoders = [], []
+    for idx, query in enumerate(queries):
+        position = func.row_number().over(order_by=query.statement._order_by_clauses)
+        rows = query.add_columns(position.label("batch_position")).subquery()
+        values = [column for column in rows.c if column.name != "batch_position"]
+        aggregated = func.json_agg(aggregate_order_by(func.json_build_array(*values), rows.c.batch_position))
+        columns.append(
+            select(cast(func.coalesce(aggregated, literal_column("'[]'::json")), Text))
+            .scalar_subquery()
+            .label(f"q{idx}")
+        )
+        decoders.append([json_decoder(column.type) for column in values])
+    result = session.execute(select(*columns)).one()
+    return [decode_json_rows(json.loads(rows, parse_float=Decimal), column_decoders)
+            for rows, column_decoders in zip(result, decoders)]
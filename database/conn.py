@@ -1,31 +1,59 @@
-from sqlalchemy import create_engine, func, literal_column, case, distinct, cast, text, desc
+from sqlalchemy import create_engine, func, literal_column, case, distinct, cast, text, desc, literal, or_, and_, tuple_, exists
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import scoping, sessionmaker,aliased
 from dotenv import load_dotenv
+from hashlib import sha256
 import os
 load_dotenv()
 
 class DBManager(object):
-    def __init__(self):
-        self.connection = self.create_connection_string()
+    # connection is one URL or a list of shard URLs (same job/file schema each).
+    # The first shard is the primary: engine/DBSession/session point at it.
+    def __init__(self, connection=None):
+        connections = connection or self.create_connection_string()
+        self.connections = [connections] if isinstance(connections, str) else list(connections)
+        self.connection = self.connections[0]
+        self.engines = [self.create_engine(url) for url in self.connections]
+        self.shard_sessions = [scoping.scoped_session(sessionmaker(bind=engine, )) for engine in self.engines]
+        self.engine = self.engines[0]
+        self.DBSession = self.shard_sessions[0]
+
+    @staticmethod
+    def create_engine(connection):
         options = {
-            "pool_recycle": 3600,
-            "pool_size": 10,
-            "pool_timeout": 30,
-            "max_overflow": 30,
             "echo": False,
             "execution_options": {"autocommit": True},
         }
-
-        self.engine = create_engine(self.connection, **options)
-        self.DBSession = scoping.scoped_session(sessionmaker(bind=self.engine, ))
+        if not connection.startswith("sqlite"):
+            options.update({
+                "pool_recycle": 3600,
+                "pool_size": 10,
+                "pool_timeout": 30,
+                "max_overflow": 30,
+            })
+        return create_engine(connection, **options)
 
     @property
     def session(self):
         return self.DBSession()
 
+    @property
+    def fingerprint(self) -> str:
+        # Stable id of the database or shard set, e.g. for keying locally cached results
+        return sha256("\n".join(sorted(self.connections)).encode("utf-8")).hexdigest()[:16]
+
+    @property
+    def sharded(self) -> bool:
+        return len(self.engines) > 1
+
     @staticmethod
-    def create_connection_string() -> str:
+    def create_connection_string():
+        # DATABASE_URLS (comma separated) runs the report over several shards;
+        # DATABASE_URL overrides the Postgres settings, e.g. sqlite:///bench.db for local runs
+        if os.environ.get("DATABASE_URLS"):
+            return [url.strip() for url in os.environ["DATABASE_URLS"].split(",") if url.strip()]
+        if os.environ.get("DATABASE_URL"):
+            return os.environ["DATABASE_URL"]
         username = os.environ.get("DB_USERNAME")
         password = os.environ.get("DB_PASSWORD")
         host = os.environ.get("SQL_HOST")
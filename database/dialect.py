@@ -0,0 +1,69 @@
+from sqlalchemy import JSON, Date, Text, case, distinct, func, literal
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+# Dialect-portable building blocks for the report queries. Postgres is the
+# production database; SQLite runs the same fetchers for local benchmark and
+# regression runs without a database service.
+
+class json_text(FunctionElement):
+    # Text value of a top-level JSON key: meta_data ->> 'key' / json_extract(meta_data, '$."key"')
+    type = Text()
+    name = "json_text"
+    inherit_cache = True
+
+    def __init__(self, column, key):
+        super().__init__(column, literal(key), literal(f'$."{key}"'))
+
+@compiles(json_text)
+def compile_json_text(element, compiler, **kw):
+    column, _, path = element.clauses
+    return f"json_extract({compiler.process(column, **kw)}, {compiler.process(path, **kw)})"
+
+@compiles(json_text, "postgresql")
+def compile_json_text_postgresql(element, compiler, **kw):
+    column, key, _ = element.clauses
+    return f"({compiler.process(column, **kw)} ->> {compiler.process(key, **kw)})"
+
+class day_bucket(FunctionElement):
+    # Calendar day of a timestamp, returned as a date on every backend
+    type = Date()
+    name = "day_bucket"
+    inherit_cache = True
+
+@compiles(day_bucket)
+def compile_day_bucket(element, compiler, **kw):
+    return f"date({compiler.process(element.clauses, **kw)})"
+
+@compiles(day_bucket, "postgresql")
+def compile_day_bucket_postgresql(element, compiler, **kw):
+    return f"CAST({compiler.process(element.clauses, **kw)} AS DATE)"
+
+class distinct_list(FunctionElement):
+    # JSON array of the distinct values of a group (as text, so UUIDs work too), in no
+    # particular order: json_agg(DISTINCT x::text) / json_group_array(DISTINCT x)
+    type = JSON()
+    name = "distinct_list"
+    inherit_cache = True
+
+@compiles(distinct_list)
+def compile_distinct_list(element, compiler, **kw):
+    return f"json_group_array(DISTINCT CAST({compiler.process(element.clauses, **kw)} AS TEXT))"
+
+@compiles(distinct_list, "postgresql")
+def compile_distinct_list_postgresql(element, compiler, **kw):
+    return f"json_agg(DISTINCT CAST({compiler.process(element.clauses, **kw)} AS TEXT))"
+
+def day_key(value) -> str:
+    return value.isoformat()
+
+def count_if(condition, column, distinct_values=False):
+    # Conditional aggregate via CASE, which every backend supports (unlike FILTER)
+    counted = case((condition, column))
+    return func.count(distinct(counted) if distinct_values else counted)
+
+def dialect_name(session) -> str:
+    return session.get_bind().dialect.name
+
+def supports_grouping_sets(session) -> bool:
+    return dialect_name(session) != "sqlite"
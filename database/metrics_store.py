@@ -0,0 +1,57 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from dotenv import load_dotenv
+load_dotenv()
+
+class MetricsStore(object):
+    # Local store of per-period metric results. Closed periods never change,
+    # so later runs read them from here and only query the open period.
+    # source identifies the database (or shard set) the values came from, see
+    # DBManager.fingerprint; values from one source are never read for another.
+    def __init__(self, path=None, source=""):
+        self.path = path or os.environ.get("METRICS_STORE_PATH", "metrics_store.db")
+        self.source = source
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS source_metric_period ("
+            " source TEXT NOT NULL,"
+            " metric TEXT NOT NULL,"
+            " period TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " recorded_at TEXT NOT NULL,"
+            " PRIMARY KEY (source, metric, period))"
+        )
+        self.conn.commit()
+
+    def get(self, metric, periods) -> dict:
+        periods = list(periods)
+        if not periods:
+            return {}
+        found = {}
+        with self.lock:
+            # Chunked to stay under SQLite's bound parameter limit
+            for start in range(0, len(periods), 500):
+                chunk = periods[start:start + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                rows = self.conn.execute(
+                    "SELECT period, payload FROM source_metric_period"
+                    f" WHERE source = ? AND metric = ? AND period IN ({placeholders})",
+                    [self.source, metric, *chunk],
+                ).fetchall()
+                found.update((period, json.loads(payload)) for period, payload in rows)
+        return found
+
+    def put(self, metric, values_by_period):
+        recorded_at = datetime.now().isoformat(timespec="seconds")
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO source_metric_period (source, metric, period, payload, recorded_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [(self.source, metric, period, json.dumps(values), recorded_at)
+                 for period, values in values_by_period.items()],
+            )
+            self.conn.commit()
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+import argparse
+import hashlib
+import logging
+import random
+import uuid
+
+from database.conn import DBManager
+from model.models import Base, File, Job, Status
+
+# Synthetic job/file data for local benchmark and regression runs, e.g.
+#   python -m database.seed sqlite:///bench.db --jobs 20000
+#   DATABASE_URL=sqlite:///bench.db python main.py --format json
+# Shards: seed each with its own --seed (md5s overlap across shards), then
+#   DATABASE_URLS=sqlite:///eu.db,sqlite:///us.db python main.py --format json
+
+STATUS_LABELS = {5: "DONE", 7: "CANCELLED"}
+FILE_STATUSES = ["DONE", "PROCESSED", "DUPLICATE", "PROCESSING", "UNKNOWN", "FAILED", "TIMEOUT "]
+SOURCE_CATEGORIES = ["email", "web", "upload", "api", "scanner", "archive", ""]
+
+# Indexes the report queries rely on that the model doesn't declare, for local
+# databases, e.g. the per-job EXISTS on file.job_id, which otherwise scans file per
+# job, and the per-md5 grouping and lookups of the duplicate-hash pages
+LOCAL_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_file_job_id ON file (job_id)",
+    "CREATE INDEX IF NOT EXISTS ix_file_md5 ON file (md5)",
+]
+
+def seed(connection, jobs=1000, users=5, days=120, seed_value=0):
+    db = DBManager(connection)
+    Base.metadata.create_all(db.engine)
+    with db.engine.begin() as ddl:
+        for statement in LOCAL_INDEXES:
+            ddl.exec_driver_sql(statement)
+    rng = random.Random(seed_value)
+    now = datetime.now()
+    session = db.session
+
+    session.add_all(Status(id=status_id, label=STATUS_LABELS.get(status_id, f"STATUS_{status_id}"))
+                    for status_id in range(1, 8))
+    md5_pool = [hashlib.md5(str(n).encode()).hexdigest() for n in range(int(jobs * 1.5))]
+    for n in range(jobs):
+        created = now - timedelta(days=rng.uniform(0, days))
+        deadline = created + timedelta(hours=rng.choice([12, 24, 36, 48, 60, 72, 84]))
+        user = f"user{n % users}"
+        job = Job(
+            user=user,
+            job_id=uuid.UUID(int=rng.getrandbits(128)).hex,
+            submission_deadline=deadline,
+            date_created=created,
+            last_modified_date=deadline + timedelta(hours=rng.uniform(-24, 12)),
+            message_priority=rng.randint(1, 7),
+            status_id=rng.choice([5, 5, 5, 5, 7, 2, 3]),
+        )
+        session.add(job)
+        for md5 in rng.sample(md5_pool, rng.randint(1, 4)):
+            session.add(File(
+                sha1=hashlib.sha1(f"{job.job_id}{md5}".encode()).hexdigest(),
+                md5=md5,
+                source=f"source-{rng.randint(1, 20)}",
+                meta_data={"sourceCategory": rng.choice(SOURCE_CATEGORIES)},
+                date_created=created,
+                s3_location=f"s3://bucket/{md5}" if rng.random() < 0.8 else None,
+                status=rng.choice(FILE_STATUSES),
+                user=user,
+                job_id=job.job_id,
+            ))
+        if n % 1000 == 999:
+            session.commit()
+    session.commit()
+    logging.info(f"Seeded {jobs} jobs into {connection}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Seed a local database with synthetic report data")
+    parser.add_argument("connection", help="SQLAlchemy URL, e.g. sqlite:///bench.db")
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    seed(args.connection, args.jobs, args.users, args.days, args.seed)
@@ -0,0 +1,78 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from database.batch import batch_executor
+
+# Sharded execution: the same report queries run on every shard (regional
+# databases with the same job/file schema) in parallel, and their rows are merged
+# as partial aggregates. A query marks how its rows merge with partial():
+#   partial(query, keys=2)                         first 2 columns group, the rest are summed
+#   partial(query, 1, "sum", "union", "min", "max") one merge op per value column
+
+def merge_sum(a, b):
+    if a is None or b is None:
+        return b if a is None else a
+    return a + b
+
+def merge_min(a, b):
+    return b if a is None or (b is not None and b < a) else a
+
+def merge_max(a, b):
+    return b if a is None or (b is not None and b > a) else a
+
+def merge_union(a, b):
+    # Distinct value lists, e.g. distinct_list() columns
+    if a is None or b is None:
+        return b if a is None else a
+    return sorted(set(a) | set(b))
+
+MERGE_OPS = {"sum": merge_sum, "min": merge_min, "max": merge_max, "union": merge_union}
+
+def partial(query, keys, *ops):
+    for op in ops:
+        if op not in MERGE_OPS:
+            raise ValueError(f"merge op must be one of {sorted(MERGE_OPS)}")
+    return query.execution_options(partial=(keys, ops))
+
+def partial_spec(query):
+    spec = query.statement.get_execution_options().get("partial")
+    if spec is None:
+        raise ValueError(f"query has no partial() merge spec, it can't run sharded:\n{query}")
+    return spec
+
+def merge_partials(shard_rows, keys, ops=()):
+    # Rows of every shard -> one row per key, in first-seen order
+    merged = {}
+    for rows in shard_rows:
+        for row in rows:
+            key, values = tuple(row[:keys]), tuple(row[keys:])
+            current = merged.get(key)
+            if current is None:
+                merged[key] = values
+                continue
+            merged[key] = tuple(MERGE_OPS[ops[idx] if idx < len(ops) else "sum"](a, b)
+                                for idx, (a, b) in enumerate(zip(current, values)))
+    return [key + values for key, values in merged.items()]
+
+class ShardExecutor(object):
+    # Query executor for database.batch.run_queries / run_batched: runs each step's
+    # queries on all shards at once (batched per shard with batch) and returns the
+    # merged rows. The thread pool lives as long as the engines.
+    def __init__(self, shard_sessions, workers=None):
+        self.shard_sessions = shard_sessions
+        self.pool = ThreadPoolExecutor(max_workers=workers or len(shard_sessions), thread_name_prefix="shard")
+
+    def run_on_shard(self, shard_session, queries, batch):
+        try:
+            if batch:
+                return batch_executor(shard_session)(queries)
+            return [shard_session.execute(query.statement).all() for query in queries]
+        finally:
+            shard_session.remove()
+
+    def __call__(self, queries, batch=False):
+        specs = [partial_spec(query) for query in queries]
+        futures = [self.pool.submit(self.run_on_shard, shard_session, queries, batch)
+                   for shard_session in self.shard_sessions]
+        shard_results = [future.result() for future in futures]
+        return [merge_partials([result[idx] for result in shard_results], *spec)
+                for idx, spec in enumerate(specs)]
@@ -1,9 +1,24 @@
-from database.conn import DBManager, func, literal_column, case, distinct, cast, text, desc, JSONB
+from database.conn import DBManager, func, case, desc, literal, or_, and_, tuple_, exists
+from database.dialect import json_text, day_bucket, day_key, count_if, distinct_list, supports_grouping_sets
+from database.metrics_store import MetricsStore
+from database.batch import run_queries, run_batched
+from database.shard import ShardExecutor, partial
 from model.models import File, Job
+from model.frame import ResultFrame
+from model.period import Period, quarter_period, quarter_periods
 from ppt_generator.ppt_table import ppt
-from collections import Counter
-from datetime import date, timedelta, datetime
+from ppt_generator.chart_workbook import CHART_WORKBOOK_MODES
+from ppt_generator.backends import OUTPUT_BACKENDS, stream_csv
+from ppt_generator.deck_manifest import section_hash, load_manifest, write_manifest
+from profiling import profiler
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+from bisect import bisect_right
+from queue import Queue, Empty, Full
+import threading
+import argparse
 import os
+import re
 import logging
 
 logging.basicConfig(
@@ -12,109 +27,260 @@ logging.basicConfig(
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 
-try:
-    db = DBManager()
-    session = db.session
-    logging.info("DBManager initialized successfully. Session is available.")
-except Exception as e:
-    logging.error("Initialization failed:", e)
+class Lazy(object):
+    # Builds its object on first use and forwards attribute access and calls to it.
+    # Database resources are opened this way rather than at import, so render worker
+    # processes (spawned on Windows, where they re-import this module) open none.
+    def __init__(self, build):
+        self.lazy_build = build
+        self.lazy_lock = threading.Lock()
+        self.lazy_value = None
 
-def fetch_exception(exclude_result):
+    def resolve(self):
+        with self.lazy_lock:
+            if self.lazy_value is None:
+                self.lazy_value = self.lazy_build()
+            return self.lazy_value
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+def open_db():
     try:
-        results = (
-            session.query(File.status)
-            .filter(~File.status.in_(exclude_result))
-            .all()
+        manager = DBManager()
+        logging.info("DBManager initialized successfully. Session is available.")
+        return manager
+    except Exception as e:
+        logging.error("Initialization failed:", exc_info=True)
+        raise
+
+db = Lazy(open_db)
+
+def release_session():
+    # Hand this thread's connection back to the pool. Does nothing when the database
+    # never opened, so cleanup can't raise over the error that stopped the work
+    if db.lazy_value is not None:
+        db.lazy_value.DBSession.remove()
+# Thread-local session proxy, so the report server can run fetchers from worker threads
+session = Lazy(lambda: db.DBSession)
+metrics_store = Lazy(lambda: MetricsStore(source=db.fingerprint))
+# Runs the report queries on every shard when DATABASE_URLS lists several
+shards = Lazy(lambda: ShardExecutor(db.shard_sessions, workers=4 * len(db.shard_sessions)))
+
+REPORT_QUARTER = quarter_period(2025, 2)
+
+def user_columns(model, by_user):
+    # Leading GROUP BY column when fanning the report out per customer user
+    return [model.user] if by_user else []
+
+def rows_by_user(rows, by_user):
+    # Rows start with the user column when fanning out, otherwise all rows belong to one report (None)
+    groups = {}
+    for row in rows:
+        user, values = (row[0], tuple(row[1:])) if by_user else (None, tuple(row))
+        groups.setdefault(user, []).append(values)
+    return groups
+
+class PerUser(dict):
+    # {user: result} of a fetcher run with by_user. empty is the result for a user
+    # without any rows, so each user's report has the sections a single run has
+    def __init__(self, results=(), empty=None):
+        super().__init__(results)
+        self.empty = empty
+
+    def map(self, build):
+        return PerUser({user: build(item) for user, item in self.items()}, build(self.empty))
+
+def fan_out(groups, build, by_user):
+    if by_user:
+        return PerUser({user: build(rows) for user, rows in groups.items()}, build([]))
+    return build(groups.get(None, []))
+
+def count_by_period(key, counted, periods, *criteria, by_user=False):
+    # One scan for every period plus the per-period totals via GROUPING SETS
+    if periods[0].start is None:
+        period = literal(periods[0].label)
+    else:
+        period = case(*[(File.date_created.between(p.start, p.end), p.label) for p in periods])
+        criteria += (or_(*[File.date_created.between(p.start, p.end) for p in periods]),)
+
+    subq = (
+        session.query(*user_columns(File, by_user), period.label("period"), key.label("key"), counted.label("counted"))
+        .filter(*criteria)
+        .subquery()
+    )
+    users = user_columns(subq.c, by_user)
+    grouping_sets = supports_grouping_sets(session)
+    if grouping_sets:
+        query = (
+            session.query(
+                *users,
+                subq.c.period,
+                subq.c.key,
+                func.grouping(subq.c.key).label("is_total"),
+                func.count(subq.c.counted).label("count")
+            )
+            .group_by(func.grouping_sets(tuple_(*users, subq.c.period, subq.c.key), tuple_(*users, subq.c.period)))
+        )
+    else:
+        # No GROUPING SETS (SQLite): the totals are summed from the same rows below
+        query = (
+            session.query(
+                *users,
+                subq.c.period,
+                subq.c.key,
+                literal(0).label("is_total"),
+                func.count(subq.c.counted).label("count")
+            )
+            .group_by(*users, subq.c.period, subq.c.key)
         )
 
-        # Strip and count manually
-        cleaned = [status[0].strip() for status in results]
-        counts = Counter(cleaned)
+    def build(rows):
+        counts = {}
+        totals = {p.label: 0 for p in periods}
+        for period_label, key_value, is_total, count in rows:
+            if is_total:
+                totals[period_label] = count
+            else:
+                counts.setdefault(key_value, {p.label: 0 for p in periods})[period_label] = count
+                if not grouping_sets:
+                    totals[period_label] += count
+        # Largest in the first (current) period first
+        ordered = sorted(counts.items(), key=lambda item: item[1][periods[0].label], reverse=True)
+        return ordered, totals
+
+    rows, = yield [partial(query, len(users) + 3)]
+    return fan_out(rows_by_user(rows, by_user), build, by_user)
+
+def fetch_exception(exclude_result, periods=None, by_user=False):
+    try:
+        by_period = periods is not None
+        periods = periods or [Period("count", None, None)]
+
+        def build(counted):
+            counts, totals = counted
+            data = ResultFrame([("status", str), *[(label, int) for label in totals]],
+                               [(status, *values.values()) for status, values in counts])
+            if by_period:
+                data.append(("TOTAL", *totals.values()))
+            return data
 
-        logging.info(f"Fetched and processed {len(results)} statuses excluding {exclude_result}")
-        return [{"status": status, "count": count} for status, count in counts.items()]
+        counted = yield from count_by_period(func.trim(File.status), File.id, periods,
+                                             ~File.status.in_(exclude_result), by_user=by_user)
+        logging.info(f"Fetched and processed statuses excluding {exclude_result}")
+        return counted.map(build) if by_user else build(counted)
     
 
     except Exception as e:
         logging.error("error in fetching exception",exc_info=True)
         return []
     
-def fetch_status_files():
+def md5_group_counts(rows):
+    # Per-md5 file counts -> (deduplicated files, duplicate groups, unique files)
+    deduplicated = groups = unique = 0
+    for _, files in rows:
+        if files > 1:
+            deduplicated += files - 1
+            groups += 1
+        elif files == 1:
+            unique += 1
+    return deduplicated, groups, unique
+
+def fetch_status_files(by_user=False):
     try:
-        # Metric functions with label and callable logic
-        metric_functions = [
+        users = user_columns(File, by_user)
+        per_md5 = (
+            session.query(*users, File.md5, func.count(File.id).label("files"))
+            .group_by(*users, File.md5)
+        )
+        duplicate_groups = per_md5.having(func.count(File.id) > 1).subquery()
+        unique_groups = per_md5.having(func.count(File.id) == 1).subquery()
+
+        # Metric queries with their labels, each returns a count per user
+        count_queries = [
             (
-                "Total Files", lambda: session
-                .query(func.count())
+                "Total Files", session
+                .query(*users, func.count())
                 .select_from(File)
-                .scalar()),
+                .group_by(*users)),
             (
-                "Processed Files", lambda: session
-                .query(func.count())
+                "Processed Files", session
+                .query(*users, func.count())
                 .filter(File.status != 'PROCESSING')
-                .scalar()),
+                .group_by(*users)),
             (
-                "Deduplicated Files", lambda: 
-                sum(row.duplicates for row in session
-                    .query(File.md5, (func.count(File.id) - 1)
-                    .label("duplicates"))
-                    .group_by(File.md5)
-                    .having(func.count(File.id) > 1)
-                    .all())),
+                "Null Files", session
+                .query(*users, func.count())
+                .filter(File.status.is_(None))
+                .group_by(*users)),
+        ]
+        group_queries = [
             (
-                "Duplicate Groups", lambda: 
-                len(session
-                    .query(File.md5)
-                    .group_by(File.md5)
-                    .having(func.count(File.id) > 1)
-                    .all())),
+                "Deduplicated Files", session
+                .query(*user_columns(duplicate_groups.c, by_user), func.sum(duplicate_groups.c.files - 1))
+                .group_by(*user_columns(duplicate_groups.c, by_user))),
             (
-                "Unique Files", lambda: 
-                sum(row.unique for row in session
-                    .query(File.md5, func.count(File.id)
-                    .label("unique"))
-                    .group_by(File.md5)
-                    .having(func.count(File.id) == 1)
-                    .all())),
+                "Duplicate Groups", session
+                .query(*user_columns(duplicate_groups.c, by_user), func.count())
+                .select_from(duplicate_groups)
+                .group_by(*user_columns(duplicate_groups.c, by_user))),
             (
-                "Null Files", lambda: session
-                .query(func.count())
-                .filter(File.status.is_(None))
-                .scalar()),
+                "Unique Files", session
+                .query(*user_columns(unique_groups.c, by_user), func.count())
+                .select_from(unique_groups)
+                .group_by(*user_columns(unique_groups.c, by_user))),
         ]
+        titles = ["Total Files", "Processed Files", "Deduplicated Files", "Duplicate Groups", "Unique Files", "Null Files"]
+
+        values = {}
+        if db.sharded:
+            # An md5 group can span shards: merge the per-md5 counts, then derive the group metrics here
+            *metric_rows, md5_rows = yield ([partial(query, len(users)) for _, query in count_queries]
+                                            + [partial(per_md5, len(users) + 1)])
+            for user, rows in rows_by_user(md5_rows, by_user).items():
+                for (title, _), value in zip(group_queries, md5_group_counts(rows)):
+                    values.setdefault(user, {})[title] = value
+        else:
+            # All six go to the database together
+            metric_rows = yield [query for _, query in count_queries + group_queries]
+        for (title, _), metric_result in zip(count_queries + group_queries, metric_rows):
+            for user, rows in rows_by_user(metric_result, by_user).items():
+                values.setdefault(user, {})[title] = rows[0][0] or 0
+
+        def build(user_values):
+            user_values = dict(user_values)
+            return ResultFrame([("Title", str), ("Count", int)],
+                               [(title, user_values.get(title, 0)) for title in titles])
 
-        # Evaluate and return all metrics dynamically
         logging.info(f"Successfully Fetched status from files")
-        return [{"Title": title, "Count": func()} for title, func in metric_functions]
+        return fan_out(values, build, by_user)
 
     except Exception as e:
         logging.error("Error in fetch_status_files:", exc_info=True)
         return []
     
-def duplicates_from_source_category():
-    date_start = '2025-04-01 00:00:00'
-    date_end   = '2025-06-30 23:59:59'
-    try:
-        results = (
-            session.query(
-                File.meta_data['sourceCategory'].astext.label('source_category'),
-                func.count(File.md5).label('count')
-            )
-            .filter(
-                File.date_created >= date_start,
-                File.date_created <= date_end,
-                File.status == 'DUPLICATE'
-            )
-            .group_by(File.meta_data['sourceCategory'].astext)
-            .all()
-        )
+def source_category_by_status(status, title, periods=None, by_user=False):
+    # Single period keeps the "Count" column, several periods get one column each
+    columns = {REPORT_QUARTER.label: "Count"} if periods is None else {}
+    periods = periods or [REPORT_QUARTER]
 
-        data = [{"Duplicates": title, "Count": count} for title, count in results]
-        total = sum(item["Count"] for item in data)
+    def build(counted):
+        counts, totals = counted
+        data = ResultFrame([(title, str), *[(columns.get(label, label), int) for label in totals]],
+                           [(category, *values.values()) for category, values in counts])
+        data.append(("TOTAL", *totals.values()))
+        return data
 
-        # Optionally append or return separately
-        data.append({"Duplicates": "TOTAL", "Count": total})
+    counted = yield from count_by_period(json_text(File.meta_data, 'sourceCategory'), File.md5, periods,
+                                         File.status == status, by_user=by_user)
+    return counted.map(build) if by_user else build(counted)
 
+def duplicates_from_source_category(periods=None, by_user=False):
+    try:
+        data = yield from source_category_by_status('DUPLICATE', "Duplicates", periods, by_user)
         logging.info(f"Successfully fetched duplicates from source_category")
         return data
 
@@ -122,30 +288,9 @@ def duplicates_from_source_category():
         logging.error("error in fetching duplicates from source_category",e)
         return []
     
-def processed_from_source_category():
-    date_start = '2025-04-01 00:00:00'
-    date_end   = '2025-06-30 23:59:59'
+def processed_from_source_category(periods=None, by_user=False):
     try:
-        results = (
-            session.query(
-                File.meta_data['sourceCategory'].astext.label('source_category'),
-                func.count(File.md5).label('count')
-            )
-            .filter(
-                File.date_created >= date_start,
-                File.date_created <= date_end,
-                File.status == 'PROCESSED'
-            )
-            .group_by(File.meta_data['sourceCategory'].astext)
-            .all()
-        )
-
-        data = [{"Processed": title, "Count": count} for title, count in results]
-        total = sum(item["Count"] for item in data)
-
-        # Optionally append or return separately
-        data.append({"Processed": "TOTAL", "Count": total})
-
+        data = yield from source_category_by_status('PROCESSED', "Processed", periods, by_user)
         logging.info(f"Successfully fetched processed filed from source_category")
         return data
 
@@ -153,41 +298,32 @@ def processed_from_source_category():
         logging.error("error in fetching processed files from source_category",e)
         return []
     
-def sourceCategory_count():
+def sourceCategory_count(by_user=False):
     try :
-        subq = (
-            session.query(
-                File.meta_data['sourceCategory'].astext.label("source_category"),
-                func.count(File.md5).label("count")
-            )
-            .group_by(File.meta_data['sourceCategory'].astext)
-        ).subquery()
-
-        # CASE logic for grouping categories with count < 1000
-        group_case = case(
-            (subq.c.count < 1000, literal_column("'Other Source Category < 1000 each'")),
-            else_=subq.c.source_category
-        ).label("source_category")
-
-        # Main query: sum counts, group by adjusted category, order with 'Data less than 1k' at bottom
+        users = user_columns(File, by_user)
+        source_category = json_text(File.meta_data, 'sourceCategory').label("source_category")
         query = (
             session.query(
-                group_case,
-                func.sum(subq.c.count).label("count")
-            )
-            .group_by(group_case)
-            .order_by(
-                case(
-                    (group_case == 'Other Source Category < 1000 each', 1),
-                    else_=0
-                ),
-                func.sum(subq.c.count).desc()
+                *users,
+                source_category,
+                func.count(File.md5).label("count")
             )
+            .group_by(*users, source_category)
         )
 
+        # Categories with count < 1000 are grouped after the per-category counts are
+        # complete (summed across shards), with 'Other' at the bottom
+        other = 'Other Source Category < 1000 each'
+        def build(rows):
+            grouped = {}
+            for category, count in rows:
+                label = other if count < 1000 else category
+                grouped[label] = grouped.get(label, 0) + count
+            ordered = sorted(grouped.items(), key=lambda item: (item[0] == other, -item[1]))
+            return ResultFrame([("SourceCategory", str), ("Job Count", int)], ordered)
 
-        # Return result as list of dictionaries
-        results =  [{"SourceCategory": title, "Job Count": count} for title, count in query.all()]
+        rows, = yield [partial(query, len(users) + 1)]
+        results = fan_out(rows_by_user(rows, by_user), build, by_user)
         logging.info(f"Fetched {len(results)} grouped sourceCategory results")
         return results
     
@@ -195,123 +331,386 @@ def sourceCategory_count():
         logging.error("error in sourceCategory_count",e)
         return []
 
-def fetch_SLA_jobs():
+def has_files(*criteria):
+    # EXISTS semi-join: counts stay per job instead of multiplying by files per job
+    return exists().where(File.job_id == Job.job_id, *criteria)
+
+def job_primary_category():
+    # Each job's primary sourceCategory: the one most of its files have. Ties go to a
+    # named category over a blank one, then alphabetically. Join on rank == 1.
+    category = json_text(File.meta_data, 'sourceCategory')
+    per_category = (
+        session.query(
+            File.job_id.label("job_id"),
+            category.label("source_category"),
+            func.count(File.id).label("files"),
+        )
+        .group_by(File.job_id, category)
+        .subquery()
+    )
+    blank = case((func.coalesce(per_category.c.source_category, "") == "", 1), else_=0)
+    return (
+        session.query(
+            per_category.c.job_id,
+            per_category.c.source_category,
+            func.row_number().over(
+                partition_by=per_category.c.job_id,
+                order_by=(per_category.c.files.desc(), blank, per_category.c.source_category),
+            ).label("rank"),
+        )
+        .subquery()
+    )
+
+def fetch_SLA_jobs(by_user=False):
     try:
+        users = user_columns(Job, by_user)
         query = (
             session.query(
+                *users,
                 Job.message_priority,
                 func.count(Job.job_id).label("job_count")
             )
-            .join(File, Job.job_id == File.job_id)
-            .group_by(Job.message_priority)
-            .order_by(desc(Job.message_priority))
+            .filter(has_files())
+            .group_by(*users, Job.message_priority)
+            .order_by(*users, desc(Job.message_priority))
         )
 
-        total_job_with_SLA = []
-        for item in query.all():
-            if item[0] == 7:
-                new_item = (item[0], "12hrs", item[1])
-            elif  item[0] == 6:
-                new_item = (item[0], "24hrs", item[1])
-            elif  item[0] == 5:
-                new_item = (item[0], "36hrs", item[1])
-            elif  item[0] == 4:
-                new_item = (item[0], "48hrs", item[1])
-            elif  item[0] == 3:
-                new_item = (item[0], "60hrs", item[1])
-            elif  item[0] == 2:
-                new_item = (item[0], "72hrs", item[1])
-            elif  item[0] == 1:
-                new_item = (item[0], ">84hrs", item[1])
-            else:
-                new_item = item
-            total_job_with_SLA.append(new_item)
-
-        job_done = sum(row.job_count for row in query.filter(Job.status_id == 5,
-                                   File.s3_location.isnot(None)))
-        job_done_within_SLA = sum(row.job_count for row in query.filter(Job.status_id == 5,
-                                    File.s3_location.isnot(None),
-                                    Job.last_modified_date > Job.submission_deadline))
-        
+        def sla_rows(rows):
+            total_job_with_SLA = []
+            # Highest priority first (NULL first, as in Postgres DESC); merged shard rows come unordered
+            for item in sorted(rows, key=lambda item: (item[0] is None, item[0] or 0), reverse=True):
+                if item[0] == 7:
+                    new_item = (item[0], "12hrs", item[1])
+                elif  item[0] == 6:
+                    new_item = (item[0], "24hrs", item[1])
+                elif  item[0] == 5:
+                    new_item = (item[0], "36hrs", item[1])
+                elif  item[0] == 4:
+                    new_item = (item[0], "48hrs", item[1])
+                elif  item[0] == 3:
+                    new_item = (item[0], "60hrs", item[1])
+                elif  item[0] == 2:
+                    new_item = (item[0], "72hrs", item[1])
+                elif  item[0] == 1:
+                    new_item = (item[0], ">84hrs", item[1])
+                else:
+                    new_item = (item[0], "N/A", item[1])
+                total_job_with_SLA.append(new_item)
+            return total_job_with_SLA
+
+        done = (
+            session.query(*users,
+                          func.count(Job.job_id).label("job_done"),
+                          count_if(Job.last_modified_date > Job.submission_deadline, Job.job_id).label("job_done_within_SLA"))
+            .filter(Job.status_id == 5, has_files(File.s3_location.isnot(None)))
+            .group_by(*users)
+        )
+        done_result, priority_rows = yield [partial(done, len(users)), partial(query, len(users) + 1)]
+        done_rows = rows_by_user(done_result, by_user)
+        job_done = {user: rows[0][0] for user, rows in done_rows.items()}
+        job_done_within_SLA = {user: rows[0][1] for user, rows in done_rows.items()}
+
+        def build(rows, done=0, done_within_SLA=0):
+            return [ResultFrame([("Priority", int), ("SLA(hrs)", str), ("Job Count", int)], sla_rows(rows)),
+                    ResultFrame([("job_done", int), ("job_done_within_SLA", int)], [(done, done_within_SLA)])]
+
+        per_user = rows_by_user(priority_rows, by_user)
+        results = {
+            user: build(rows, job_done.get(user, 0), job_done_within_SLA.get(user, 0))
+            for user, rows in (per_user if per_user or by_user else {None: []}).items()
+        }
+
         logging.info(f"Successfully fetched SLA Jobs")
-        return [[{"Priority": priority, "SLA(hrs)": hours, "Job Count": jobCount} for priority, hours, jobCount in total_job_with_SLA], [{'job_done': job_done,'job_done_within_SLA': job_done_within_SLA}]]
+        return PerUser(results, build([])) if by_user else results.get(None, [])
     
     except Exception as e:
         logging.error("error in fetch_SLA_jobs",e)
         return []
     
-def fetch_total_and_cancelled_jobs():
+# Days still treated as open: today and yesterday cover any client/database timezone offset
+OPEN_DAYS = 2
+
+def fetch_total_and_cancelled_jobs(weeks=8, by_user=False):
     curr_date = date.today()
-    past_week = curr_date - timedelta(days = 7)
-    counter = 0
+    first_day = curr_date - timedelta(days = 7 * weeks)
+    days = [str(first_day + timedelta(days = n)) for n in range((curr_date - first_day).days + 1)]
+    # Stored per day as {user: counts}; the single-report metric keeps one "" entry
+    metric = "job_received_daily_by_user" if by_user else "job_received_daily"
+
+    try:
+        # Closed days come from the metrics store, only the open days and any gaps are queried.
+        # "Today" is the client's date but days are bucketed in the database session's
+        # timezone, so the last OPEN_DAYS days are always queried and never stored.
+        closed = days[:-OPEN_DAYS]
+        daily = metrics_store.get(metric, closed)
+        missing = [day for day in days if day not in daily]
 
-    try: 
-        job_tup = []
-        total_job_count = (
+        users = user_columns(Job, by_user)
+        day_created = day_bucket(Job.date_created).label("day")
+        query = (
             session
-            .query(func.count(distinct(Job.job_id))
-            .label("job_count"))
-            .join(File, Job.job_id == File.job_id)
+            .query(*users,
+                   day_created,
+                   func.count(Job.job_id).label("job_count"),
+                   count_if(Job.status_id == 7, Job.job_id).label("cancelled_count"))
+            .filter(has_files(),
+                    Job.date_created >= f"{missing[0]} 00:00:00",
+                    Job.date_created <= f"{curr_date} 23:59:59")
+            .group_by(*users, day_created)
         )
-        while counter < 8:
-
-            job_date = datetime.strptime(f'{curr_date}', '%Y-%m-%d')
-            job_past_week = datetime.strptime(f'{past_week}', '%Y-%m-%d')
-            date_curr_str = f'{job_date.strftime("%b")} {job_date.day}'
-            date_past_str = f'{job_past_week.strftime("%b")} {job_past_week.day}' 
-            temp_tup = (f'{date_past_str} - {date_curr_str}',
-                           total_job_count.filter(Job.date_created >= f"{past_week} 00:00:00",
-                                                  Job.date_created <= f"{curr_date} 23:59:59")
-                                          .scalar(),
-                           total_job_count.filter(Job.status_id == 7,
-                                                  Job.date_created >= f"{past_week} 00:00:00",
-                                                  Job.date_created <= f"{curr_date} 23:59:59")
-                                          .scalar())
-            job_tup.append(temp_tup)
-            curr_date = past_week
-            past_week = past_week - timedelta(days = 7)
-            counter += 1
-
-        logging.info(f"Successfully fetch_total_and_cancelled_jobs")
-        return [{"DATE": day_date, "TOTAL": job_count, "CANCELLED": cancelled_job} for day_date,job_count,cancelled_job in job_tup]
+        fetched = {day: {} for day in missing}
+        day_rows, = yield [partial(query, len(users) + 1)]
+        for user, rows in rows_by_user(day_rows, by_user).items():
+            for day, job_count, cancelled_count in rows:
+                # A gap is queried through today, so stored days in between come back too
+                if day_key(day) in fetched:
+                    fetched[day_key(day)][user or ""] = {"total": job_count, "cancelled": cancelled_count}
+        if not by_user:
+            fetched = {day: counts.get("", {"total": 0, "cancelled": 0}) for day, counts in fetched.items()}
+        daily.update(fetched)
+        metrics_store.put(metric, {day: fetched[day] for day in missing if day in closed})
+
+        def weekly(day_counts):
+            job_tup = []
+            for counter in range(weeks):
+                job_date = curr_date - timedelta(days = 7 * counter)
+                job_past_week = job_date - timedelta(days = 7)
+                date_curr_str = f'{job_date.strftime("%b")} {job_date.day}'
+                date_past_str = f'{job_past_week.strftime("%b")} {job_past_week.day}'
+                # Week windows include both end days, as the per-week queries did
+                window = [day_counts(str(job_past_week + timedelta(days = n))) for n in range(8)]
+                job_tup.append((f'{date_past_str} - {date_curr_str}',
+                                sum(item["total"] for item in window),
+                                sum(item["cancelled"] for item in window)))
+            return ResultFrame([("DATE", str), ("TOTAL", int), ("CANCELLED", int)], job_tup)
+
+        logging.info(f"Successfully fetch_total_and_cancelled_jobs ({len(missing)} day(s) queried)")
+        if not by_user:
+            return weekly(lambda day: daily[day])
+        empty = {"total": 0, "cancelled": 0}
+        all_users = {user for counts in daily.values() for user in counts}
+        return PerUser({user: weekly(lambda day, user=user: daily[day].get(user, empty)) for user in all_users},
+                       weekly(lambda day: empty))
     except Exception as e:
         logging.error("error in fetch_total_and_cancelled_jobs",e)
         return []
     
-def fetch_jobs_by_source_category():
+def fetch_jobs_by_source_category(by_user=False):
     try:
-        source_category = File.meta_data.cast(JSONB)['sourceCategory'].astext.label("source_category")
+        summary = job_primary_category()
+        users = user_columns(Job, by_user)
 
+        # Each job counted once, under its primary sourceCategory
         query = (
             session.query(
-                source_category,
+                *users,
+                summary.c.source_category,
                 func.count(Job.job_id).label("job_count")
             )
-            .join(File, Job.job_id == File.job_id)
-            .group_by(source_category)
+            .join(summary, and_(Job.job_id == summary.c.job_id, summary.c.rank == 1))
+            .group_by(*users, summary.c.source_category)
         )
 
-        source_counts = query.all()
-        over_1000 = {}
-        sum_under_1000 = 0
-
-        for source, count in source_counts:
-            if source is None or source.strip() == "":
-                source = "N/A"
-            if count >= 1000:
-                over_1000[source] = count
-            elif count < 1000:
-                sum_under_1000 += count
-                
-        sorted_over_1000 = dict(sorted(over_1000.items(), key=lambda item: item[1], reverse=True))
-        sorted_over_1000["Sources w/ Job <1000"] = sum_under_1000
+        def build(source_counts):
+            over_1000 = {}
+            sum_under_1000 = 0
+
+            for source, count in source_counts:
+                if source is None or source.strip() == "":
+                    source = "N/A"
+                if count >= 1000:
+                    over_1000[source] = over_1000.get(source, 0) + count
+                elif count < 1000:
+                    sum_under_1000 += count
+                    
+            sorted_over_1000 = dict(sorted(over_1000.items(), key=lambda item: item[1], reverse=True))
+            sorted_over_1000["Sources w/ Job <1000"] = sum_under_1000
+            return ResultFrame([("Sources", str), ("Jobs", int)], sorted_over_1000.items())
+
+        rows, = yield [partial(query, len(users) + 1)]
+        results = fan_out(rows_by_user(rows, by_user), build, by_user)
         logging.info(f"Successfully fetch_jobs_by_source_category")
-        return [{'Sources': sources, 'Jobs': jobs} for sources, jobs in sorted_over_1000.items()]
+        return results
 
     except Exception as e:
         logging.error("error in fetch_jobs_by_source_category",e)
         return []
 
+# Top duplicated md5 groups listed in the appendix slides; 0 leaves the appendix out
+DUPLICATE_APPENDIX_GROUPS = int(os.environ.get("REPORT_DUPLICATE_APPENDIX", 0))
+DUPLICATE_APPENDIX_PAGE = 12  # groups per appendix slide
+# Largest duplicate groups whose counts the server keeps for paging; pages past them use the keyset query
+DUPLICATE_PAGE_SNAPSHOT = int(os.environ.get("REPORT_DUPLICATE_SNAPSHOT", 10000))
+DUPLICATE_APPENDIX_TITLE = "Appendix: Duplicate Hashes"
+DUPLICATE_HASH_COLUMNS = [("MD5", str), ("Files", int), ("Jobs", list), ("Sources", list),
+                          ("First Seen", str), ("Last Seen", str)]
+
+def duplicate_hash_query(after=None, limit=None, by_user=False, min_files=2, md5s=None):
+    # Duplicated md5 groups, largest first, in keyset order (files desc, md5).
+    # after=(files, md5) continues right after that group, without OFFSET;
+    # md5s restricts it to those groups
+    users = user_columns(File, by_user)
+    files = func.count(File.id)
+    query = (
+        session.query(
+            *users,
+            File.md5,
+            files.label("files"),
+            distinct_list(File.job_id).label("jobs"),
+            distinct_list(File.source).label("sources"),
+            func.min(File.date_created).label("first_seen"),
+            func.max(File.date_created).label("last_seen"),
+        )
+        .filter(File.md5.isnot(None) if md5s is None else File.md5.in_(md5s))
+        .group_by(*users, File.md5)
+        .having(files >= min_files)
+    )
+    if after is not None:
+        query = query.having(or_(files < after[0], and_(files == after[0], File.md5 > after[1])))
+    if not by_user or limit is None:
+        return query.order_by(*users, files.desc(), File.md5).limit(limit)
+
+    # Top groups per user
+    ranked = query.add_columns(
+        func.row_number().over(partition_by=File.user, order_by=(files.desc(), File.md5)).label("rank")
+    ).subquery()
+    return (
+        session.query(*[column for column in ranked.c if column.name != "rank"])
+        .filter(ranked.c.rank <= limit)
+        .order_by(ranked.c.user, ranked.c.rank)
+    )
+
+def duplicate_count_partial(by_user=False):
+    # Sharded, first step: just (md5, files) per group. The counts are merged across
+    # shards before the files > 1 filter, since an md5 seen once on two shards is still
+    # a duplicate; only the groups that turn out duplicated get their lists fetched
+    users = user_columns(File, by_user)
+    query = (
+        session.query(*users, File.md5, func.count(File.id).label("files"))
+        .filter(File.md5.isnot(None))
+        .group_by(*users, File.md5)
+    )
+    return partial(query, len(users) + 1)
+
+def duplicate_hash_partial(md5s, by_user=False):
+    # Sharded, second step: the full groups of the given md5s
+    query = duplicate_hash_query(by_user=by_user, min_files=1, md5s=md5s)
+    return partial(query, len(user_columns(File, by_user)) + 1, "sum", "union", "union", "min", "max")
+
+def merged_duplicate_hashes(rows, by_user=False, after=None, limit=None):
+    # Filter, keyset order and per-user limit of duplicate_hash_query, on merged shard rows
+    users = 1 if by_user else 0
+    rows = [row for row in rows
+            if row[users + 1] > 1 and (after is None or (-row[users + 1], row[users]) > (-after[0], after[1]))]
+    rows.sort(key=lambda row: (*row[:users], -row[users + 1], row[users]))
+    if limit is None:
+        return rows
+    kept, per_user = [], {}
+    for row in rows:
+        user = row[0] if by_user else None
+        if per_user.get(user, 0) < limit:
+            kept.append(row)
+            per_user[user] = per_user.get(user, 0) + 1
+    return kept
+
+def duplicate_hash_frame(rows):
+    seen = lambda value: value.strftime("%Y-%m-%d %H:%M") if value is not None else None
+    return ResultFrame(DUPLICATE_HASH_COLUMNS,
+                       [(md5, files, sorted(jobs or []), sorted(sources or []), seen(first), seen(last))
+                        for md5, files, jobs, sources, first, last in rows])
+
+def fetch_duplicate_hashes(groups, by_user=False):
+    # Appendix drill-down: the top duplicated md5 groups, in slide-sized pages
+    if not groups:
+        return None
+    try:
+        def build(rows):
+            return [duplicate_hash_frame(rows[start:start + DUPLICATE_APPENDIX_PAGE])
+                    for start in range(0, len(rows), DUPLICATE_APPENDIX_PAGE)]
+
+        if db.sharded:
+            count_rows, = yield [duplicate_count_partial(by_user)]
+            top = {tuple(row[:-1]) for row in merged_duplicate_hashes(count_rows, by_user, limit=groups)}
+            rows = []
+            if top:
+                rows, = yield [duplicate_hash_partial(sorted({key[-1] for key in top}), by_user)]
+            users = 1 if by_user else 0
+            rows = merged_duplicate_hashes([row for row in rows if tuple(row[:users + 1]) in top], by_user)
+        else:
+            rows, = yield [duplicate_hash_query(limit=groups, by_user=by_user)]
+        results = fan_out(rows_by_user(rows, by_user), build, by_user)
+        logging.info(f"Successfully fetched top {groups} duplicate hash groups")
+        return results
+
+    except Exception as e:
+        logging.error("error in fetch_duplicate_hashes", exc_info=True)
+        return []
+
+def duplicate_hash_counts():
+    # (files, md5) of the DUPLICATE_PAGE_SNAPSHOT largest duplicated groups in keyset
+    # order: pages within them aggregate only their own groups' files
+    if db.sharded:
+        counts = merged_duplicate_hashes(shards([duplicate_count_partial()])[0], limit=DUPLICATE_PAGE_SNAPSHOT)
+        return [(files, md5) for md5, files in counts]
+    files = func.count(File.id)
+    query = (
+        session.query(files, File.md5)
+        .filter(File.md5.isnot(None))
+        .group_by(File.md5)
+        .having(files > 1)
+        .order_by(files.desc(), File.md5)
+        .limit(DUPLICATE_PAGE_SNAPSHOT)
+    )
+    return [tuple(row) for row in query.all()]
+
+def duplicate_hash_page(after=None, limit=100, counts=None):
+    # One keyset page and the key to pass as after for the next one (None at the end).
+    # Pages inside the duplicate_hash_counts() snapshot are cut from it; past its end
+    # (or without one) the keyset query finds the page's groups
+    counts = counts or []
+    complete = len(counts) < DUPLICATE_PAGE_SNAPSHOT
+    start = 0
+    if after is not None:
+        start = bisect_right(counts, (-after[0], after[1]), key=lambda count: (-count[0], count[1]))
+    page = counts[start:start + limit]
+    if len(page) == limit or (counts and complete):
+        next_key = page[-1] if page and (start + limit < len(counts) or not complete) else None
+    elif db.sharded:
+        keys = merged_duplicate_hashes(shards([duplicate_count_partial()])[0], after=after, limit=limit)
+        page = [(files, md5) for md5, files in keys]
+        next_key = page[-1] if len(page) == limit else None
+    else:
+        rows = duplicate_hash_query(after, limit).all()
+        next_key = (rows[-1][1], rows[-1][0]) if len(rows) == limit else None
+        return duplicate_hash_frame(rows), next_key
+
+    md5s = [md5 for _, md5 in page]
+    if not md5s:
+        rows = []
+    elif db.sharded:
+        rows = merged_duplicate_hashes(shards([duplicate_hash_partial(md5s)])[0])
+    else:
+        rows = duplicate_hash_query(md5s=md5s).all()
+    return duplicate_hash_frame(rows), next_key
+
+def iter_duplicate_hashes(page_size=1000, after=None):
+    # Every duplicated group through a server-side cursor, one page in memory at a time.
+    # Sharded runs merge the per-md5 counts first, then fetch the groups' lists a page at a time
+    if db.sharded:
+        counts = merged_duplicate_hashes(shards([duplicate_count_partial()])[0], after=after)
+        for start in range(0, len(counts), page_size):
+            md5s = [md5 for md5, _ in counts[start:start + page_size]]
+            yield duplicate_hash_frame(merged_duplicate_hashes(shards([duplicate_hash_partial(md5s)])[0]))
+        return
+    statement = duplicate_hash_query(after).statement.execution_options(yield_per=page_size)
+    for rows in session.execute(statement).partitions():
+        yield duplicate_hash_frame(rows)
+
+def write_duplicate_hashes_csv(path, page_size=1000):
+    with open(path, "w", newline="", encoding="utf-8") as out:
+        count = stream_csv([name for name, _ in DUPLICATE_HASH_COLUMNS], iter_duplicate_hashes(page_size), out)
+    logging.info(f"{count} duplicate hash groups written to {path}")
+
 def generate_ppt(prs, 
                  title=None, 
                  table_data=None, 
@@ -321,76 +720,324 @@ def generate_ppt(prs,
     prs.add_slide()
     if title:
         prs.add_title(title)
-    if table_data and title != 'Jobs by Priority':
-        prs.add_table(table_data)
+    if table_data and title not in ('Jobs by Priority', DUPLICATE_APPENDIX_TITLE):
+        with profiler.phase("table"):
+            prs.add_table(table_data)
     if title == "Job Received Count":
         prs.add_slide()
         prs.add_title(title)
-        prs.jobs_cancelled_add_graph(table_graph)
+        with profiler.phase("chart"):
+            prs.jobs_cancelled_add_graph(table_graph)
     elif title == "Jobs by Priority":
-        prs.add_SLA_table(table_data)
+        with profiler.phase("table"):
+            prs.add_SLA_table(table_data)
         prs.add_slide()
         prs.add_title(title)
-        prs.add_SLA_graph(table_graph)
+        with profiler.phase("chart"):
+            prs.add_SLA_graph(table_graph)
+    elif title == DUPLICATE_APPENDIX_TITLE:
+        for page, frame in enumerate(table_data or []):
+            if page:
+                prs.add_slide()
+                prs.add_title(f"{title} ({page + 1})")
+            with profiler.phase("table"):
+                prs.add_appendix_table(frame)
     elif table_graph:
         prs.add_slide()
         if title:
             prs.add_title(title)
-        prs.add_graph(table_graph)
-    prs.save()
-    os.startfile(path)
+        with profiler.phase("chart"):
+            prs.add_graph(table_graph)
+
+EXCLUDE_RESULT = ['DONE', 'PROCESSING','UNKNOWN','DUPLICATE','PROCESSED']
+
+# Current quarter vs previous quarter vs year-over-year
+REPORT_PERIODS = quarter_periods(date(2025, 4, 1))
+
+# Each fetcher takes by_user; with by_user=True it returns a PerUser {user: result}. Fetchers
+# are generators that yield their queries (see database.batch)
+REPORT_METRICS = {
+    "exception_result": lambda by_user=False: fetch_exception(EXCLUDE_RESULT, REPORT_PERIODS, by_user),
+    "status_data": fetch_status_files,
+    "duplicate_status": lambda by_user=False: duplicates_from_source_category(REPORT_PERIODS, by_user),
+    "processed_status": lambda by_user=False: processed_from_source_category(REPORT_PERIODS, by_user),
+    "source_category_summary": sourceCategory_count,
+    "job_done_with_SLA": fetch_SLA_jobs,
+    "job_per_source": fetch_jobs_by_source_category,
+    "total_job_count": fetch_total_and_cancelled_jobs,
+    "duplicate_hashes": lambda by_user=False: fetch_duplicate_hashes(DUPLICATE_APPENDIX_GROUPS, by_user),
+}
+
+# (title, table_data, table_data2, table_graph) as keys of REPORT_METRICS
+DECK_SECTIONS = [
+    ("Exceptions Encountered in Jobs Processing", "exception_result", None, None),
+    ("Duplicate by Hash", "status_data", None, None),
+    ("Deduped vs Processed", "duplicate_status", "processed_status", None),
+    ("Source Category Summary", "source_category_summary", None, None),
+    ("Jobs by Priority", "job_done_with_SLA", None, "job_done_with_SLA"),
+    ("Job Received Count", "total_job_count", None, "total_job_count"),
+    (DUPLICATE_APPENDIX_TITLE, "duplicate_hashes", None, None),
+]
+
+# Fetchers run concurrently, each on its own thread-local session
+FETCH_WORKERS = 4
+# Fetched metrics waiting to be rendered; a full queue holds back the fetch threads
+FETCH_QUEUE_SIZE = 2
+
+def metric_fetch_order():
+    # Metrics in the order the deck first needs them, then the ones no slide uses
+    order = []
+    for _, *keys in DECK_SECTIONS:
+        order.extend(key for key in keys if key in REPORT_METRICS and key not in order)
+    return order + [name for name in REPORT_METRICS if name not in order]
+
+def shard_queries(batch=False):
+    # Query executor for sharded runs; None runs the queries on the one database
+    if not db.sharded:
+        return None
+    return lambda queries: shards(queries, batch)
+
+def fetch_metrics(by_user=False, workers=FETCH_WORKERS, queue_size=FETCH_QUEUE_SIZE, batch=False):
+    # Producer: runs the fetchers on a thread pool and yields (name, result) in
+    # completion order through a bounded queue. With batch, all fetchers run together
+    # instead and their queries go to the database in one round trip per step.
+    if batch:
+        try:
+            with profiler.phase("fetch: batch"):
+                fetchers = {name: REPORT_METRICS[name](by_user=by_user) for name in metric_fetch_order()}
+                results = run_batched(fetchers, session, shard_queries(batch=True))
+        except Exception as e:
+            logging.error("error fetching metrics: %s", e)
+            results = {name: [] for name in REPORT_METRICS}
+        finally:
+            release_session()
+        yield from results.items()
+        return
+
+    results = Queue(maxsize=queue_size)
+    stopped = threading.Event()
+
+    def fetch(name):
+        result = []
+        try:
+            with profiler.phase(f"fetch: {name}"):
+                result = run_queries(REPORT_METRICS[name](by_user=by_user), shard_queries())
+        except Exception as e:
+            logging.error(f"error fetching {name}: %s", e)
+        finally:
+            release_session()
+        while not stopped.is_set():
+            try:
+                results.put((name, result), timeout=0.1)
+                return
+            except Full:
+                continue
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch")
+    try:
+        futures = [pool.submit(fetch, name) for name in metric_fetch_order()]
+        for _ in futures:
+            while True:
+                try:
+                    yield results.get(timeout=0.1)
+                    break
+                except Empty:
+                    # Every fetch puts its result before finishing, so this only trips on a lost one
+                    if all(future.done() for future in futures) and results.empty():
+                        raise RuntimeError("fetch workers finished without a result for every metric")
+    finally:
+        # Consumer done or failed: release fetchers blocked on the full queue
+        stopped.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def collect_report(by_user=False, workers=FETCH_WORKERS, batch=False):
+    results = dict(fetch_metrics(by_user, workers, batch=batch))
+    return {name: results[name] for name in REPORT_METRICS if results.get(name) is not None}
+
+def pipelined_sections(metrics, report):
+    # Consumer: yields deck sections in DECK_SECTIONS order as soon as their metrics
+    # have arrived; results that arrive early wait in report
+    for title, *keys in DECK_SECTIONS:
+        while any(key in REPORT_METRICS and key not in report for key in keys):
+            name, result = next(metrics)
+            report[name] = result
+        section = (title, *(report.get(key) for key in keys))
+        if any(data is not None for data in section[1:]):
+            yield section
+    for name, result in metrics:
+        report[name] = result
+
+def split_report_by_user(report):
+    # {metric: {user: result}} from collect_report(by_user=True) -> {user: {metric: result}}.
+    # A user without rows for a metric gets its PerUser empty result, as a single run
+    # would; a failed fetcher returns [] instead of a per-user dict and is left out
+    per_user = {name: by_user for name, by_user in report.items() if isinstance(by_user, dict)}
+    users = {user for by_user in per_user.values() for user in by_user}
+    reports = {user: {} for user in users}
+    for name, by_user in per_user.items():
+        for user in users:
+            result = by_user.get(user, getattr(by_user, "empty", None))
+            if result is not None:
+                reports[user][name] = result
+    return reports
+
+def user_report_path(output_dir, user, output_format):
+    safe_user = re.sub(r"[^A-Za-z0-9_.@-]+", "_", str(user))
+    return os.path.join(output_dir, f"status_report_{safe_user}.{output_format}")
+
+def write_user_reports(report, output_dir, output_format="pptx", chart_workbook="full", workers=None,
+                       incremental=False):
+    # One report per user from a single set of grouped scans; rendering runs in a bounded process pool
+    reports = split_report_by_user(report)
+    os.makedirs(output_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(write_report, user_report, user_report_path(output_dir, user, output_format),
+                        output_format, chart_workbook, incremental): user
+            for user, user_report in reports.items()
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception:
+                logging.error(f"error rendering report for {futures[future]}", exc_info=True)
+    return len(reports)
+
+def report_sections(report):
+    # Sections without any metric (e.g. the appendix when it is off) are left out
+    for title, table_key, table2_key, graph_key in DECK_SECTIONS:
+        section = (title, report.get(table_key), report.get(table2_key), report.get(graph_key))
+        if any(data is not None for data in section[1:]):
+            yield section
+
+def previous_deck_slides(target, chart_workbook):
+    # (title, data hash) -> slide ids of that section in the previous deck at target
+    if not isinstance(target, str) or not os.path.exists(target):
+        return None, {}
+    prs = ppt(target, chart_workbook, template=target)
+    manifest = load_manifest(target, chart_workbook, len(prs.prs.slides))
+    if manifest is None:
+        return None, {}
+
+    slide_ids, reusable, offset = prs.slide_ids(), {}, 0
+    for entry in manifest["sections"]:
+        reusable.setdefault((entry["title"], entry["hash"]), slide_ids[offset:offset + entry["slides"]])
+        offset += entry["slides"]
+    return prs, reusable
+
+def render_report(report, target, chart_workbook="full", incremental=False):
+    return render_sections(report_sections(report), target, chart_workbook, incremental)
+
+def stream_report(target, chart_workbook="full", incremental=False, workers=FETCH_WORKERS, batch=False):
+    # Fetch and render overlapped: each section is rendered as soon as its data is in,
+    # while the later queries are still running. Returns the collected report.
+    report = {}
+    render_sections(pipelined_sections(fetch_metrics(workers=workers, batch=batch), report),
+                    target, chart_workbook, incremental)
+    return report
+
+def render_sections(sections, target, chart_workbook="full", incremental=False):
+    # target is a file path or a writable binary stream. With incremental, the previous
+    # deck at target is updated in place: sections whose data hash is unchanged keep
+    # their slides and chart parts, only changed sections are rendered again.
+    prs, reusable = previous_deck_slides(target, chart_workbook) if incremental else (None, {})
+    if prs is None:
+        prs = ppt(target, chart_workbook)
+
+    slide_order, manifest = [], []
+    for section in sections:
+        title, table_data, table_data2, table_graph = section
+        digest = section_hash(section)
+        with profiler.phase(f"render: {title}") as phase:
+            slide_ids = reusable.pop((title, digest), None)
+            if slide_ids is None:
+                slide_count = len(prs.prs.slides)
+                generate_ppt(prs,
+                    title=title,
+                    table_data=table_data,
+                    table_data2=table_data2,
+                    table_graph=table_graph)
+                slide_ids = prs.slide_ids()[slide_count:]
+                phase["slides"] = len(slide_ids)
+            else:
+                phase["reused"] = len(slide_ids)
+        slide_order.extend(slide_ids)
+        manifest.append({"title": title, "hash": digest, "slides": len(slide_ids)})
+
+    # Slides of changed or removed sections go; the rest are put back in section order
+    prs.drop_slides({slide_id for slide_ids in reusable.values() for slide_id in slide_ids})
+    prs.order_slides(slide_order)
+    with profiler.phase("save"):
+        prs.save()
+    if isinstance(target, str):
+        write_manifest(target, chart_workbook, manifest)
+    return prs
+
+def write_report(report, path, output_format="pptx", chart_workbook="full", incremental=False):
+    if output_format == "pptx":
+        render_report(report, path, chart_workbook, incremental)
+        return
+    with profiler.phase(f"write: {output_format}"):
+        with open(path, "w", newline="", encoding="utf-8") as out:
+            OUTPUT_BACKENDS[output_format](report, list(report_sections(report)), out)
 
 if __name__ == "__main__":
-    path = "status_report.pptx"
-    exclude_result = ['DONE', 'PROCESSING','UNKNOWN','DUPLICATE','PROCESSED']
-
-    # Table data
-    exception_result = fetch_exception(exclude_result)
-    status_data = fetch_status_files()
-    duplicate_status = duplicates_from_source_category()
-    processed_status = processed_from_source_category()
-    source_category_summary = sourceCategory_count()
-    job_done_with_SLA = fetch_SLA_jobs()
-    job_per_source = fetch_jobs_by_source_category()
-    total_job_count = fetch_total_and_cancelled_jobs()
-
-    logging.info("Generating Powerpoint")
-    prs = ppt(path)
-    generate_ppt(prs, 
-        title="Exceptions Encountered in Jobs Processing", 
-        table_data=exception_result, 
-        table_data2=None, 
-        table_graph=None)
-    
-    generate_ppt(prs, 
-        title="Duplicate by Hash", 
-        table_data=status_data, 
-        table_data2=None, 
-        table_graph=None)
-    
-    generate_ppt(prs, 
-        title="Deduped vs Processed", 
-        table_data=duplicate_status, 
-        table_data2=processed_status, 
-        table_graph=None)
-
-    generate_ppt(prs, 
-        title="Source Category Summary", 
-        table_data=source_category_summary, 
-        table_data2=None, 
-        table_graph=None)
-    
-    generate_ppt(prs, 
-        title="Jobs by Priority", 
-        table_data=job_done_with_SLA, 
-        table_data2=None,
-        table_graph=job_done_with_SLA)
-    
+    parser = argparse.ArgumentParser(description="Generate the job status report")
+    parser.add_argument("--output", help="defaults to status_report.<format>")
+    parser.add_argument("--format", choices=["pptx", *OUTPUT_BACKENDS], default="pptx",
+                        help="json/html/csv skip pptx rendering for quick refreshes")
+    parser.add_argument("--chart-workbook", choices=CHART_WORKBOOK_MODES, default="full",
+                        help="embedded chart workbooks: full, minimal, or none (no Edit Data)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="reuse the slides of unchanged sections from the previous deck at --output")
+    parser.add_argument("--by-user", action="store_true",
+                        help="one report per customer user, from a single set of grouped queries")
+    parser.add_argument("--output-dir", default="reports", help="where --by-user reports are written")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="parallel render workers for --by-user")
+    parser.add_argument("--fetch-workers", type=int, default=FETCH_WORKERS,
+                        help="concurrent report queries")
+    parser.add_argument("--batch-queries", action="store_true",
+                        help="send all report queries to the database in one round trip (Postgres)")
+    parser.add_argument("--duplicate-appendix", type=int, default=DUPLICATE_APPENDIX_GROUPS, metavar="GROUPS",
+                        help="append slides listing the top GROUPS duplicated md5 groups")
+    parser.add_argument("--duplicate-csv", help="also stream every duplicated md5 group to this CSV file")
+    parser.add_argument("--profile", action="store_true",
+                        help="log wall/CPU time and peak memory per fetch, slide section and save")
+    parser.add_argument("--profile-json", help="also write the phase breakdown to this JSON file")
+    parser.add_argument("--profile-cprofile", help="write cProfile stats to this file")
+    parser.add_argument("--profile-flamegraph", help="write sampled folded stacks for flamegraph.pl/speedscope")
+    args = parser.parse_args()
+    path = args.output or f"status_report.{args.format}"
+    profiler.configure(enabled=args.profile or bool(args.profile_json),
+                       cprofile_path=args.profile_cprofile,
+                       flamegraph_path=args.profile_flamegraph)
+    profiler.start()
+    DUPLICATE_APPENDIX_GROUPS = args.duplicate_appendix
+
+    logging.info(f"Generating {args.format} report")
+    if args.format == "pptx" and not args.by_user:
+        # Slides are rendered while the remaining queries run
+        stream_report(path, args.chart_workbook, incremental=args.incremental,
+                      workers=args.fetch_workers, batch=args.batch_queries)
+        logging.info(f"Report written to {path}")
+    elif args.by_user:
+        report = collect_report(by_user=True, workers=args.fetch_workers, batch=args.batch_queries)
+        count = write_user_reports(report, args.output_dir, args.format, args.chart_workbook, args.workers,
+                                   incremental=args.incremental)
+        logging.info(f"{count} user reports written to {args.output_dir}")
+    else:
+        write_report(collect_report(workers=args.fetch_workers, batch=args.batch_queries), path, args.format, args.chart_workbook)
+        logging.info(f"Report written to {path}")
 
-    generate_ppt(prs, 
-        title="Job Received Count", 
-        table_data=total_job_count, 
-        table_data2=None,
-        table_graph=total_job_count)
+    if args.duplicate_csv:
+        with profiler.phase("write: duplicate hashes"):
+            write_duplicate_hashes_csv(args.duplicate_csv)
 
-    logging.info("Powerpoint Generated")
\ No newline at end of file
+    profiler.stop()
+    if profiler.enabled:
+        logging.info("Profile:\n" + profiler.summary())
+        if args.profile_json:
+            profiler.write_json(args.profile_json)
+    if args.format == "pptx" and not args.by_user and hasattr(os, "startfile"):
+        os.startfile(path)
@@ -0,0 +1,52 @@
+from array import array
+from collections import namedtuple
+
+FrameColumn = namedtuple("FrameColumn", ["name", "type"])
+
+# Typecodes for columns that can live in a flat array instead of a list of objects
+ARRAY_TYPECODES = {int: "q", float: "d"}
+
+class ResultFrame(object):
+    # Column-oriented fetcher result. Each column is one array/list, so renderers
+    # take headers and chart series straight from it without rebuilding rows.
+    __slots__ = ("columns", "data")
+
+    def __init__(self, columns, rows=()):
+        self.columns = tuple(FrameColumn(name, kind) for name, kind in columns)
+        self.data = [array(ARRAY_TYPECODES[kind]) if kind in ARRAY_TYPECODES else []
+                     for _, kind in self.columns]
+        for row in rows:
+            self.append(row)
+
+    def append(self, row):
+        for idx, value in enumerate(row):
+            values = self.data[idx]
+            if isinstance(values, array):
+                if value is None:
+                    # Nullable numeric column, fall back to a plain list
+                    values = self.data[idx] = list(values)
+                else:
+                    value = self.columns[idx].type(value)
+            values.append(value)
+
+    @property
+    def headers(self) -> list:
+        return [column.name for column in self.columns]
+
+    def column(self, key):
+        if isinstance(key, str):
+            key = self.headers.index(key)
+        return self.data[key]
+
+    def rows(self):
+        return zip(*self.data)
+
+    def to_records(self) -> list:
+        headers = self.headers
+        return [dict(zip(headers, row)) for row in self.rows()]
+
+    def __len__(self):
+        return len(self.data[0]) if self.data else 0
+
+    def __repr__(self):
+        return f"<ResultFrame(columns={self.headers}, rows={len(self)})>"
@@ -9,6 +9,7 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Integer,
+    JSON,
     String,
     Text,
     UniqueConstraint,
@@ -58,7 +59,7 @@ class File(Base):
     md5 = Column(String(32))
     last_modified_date = Column(DateTime(timezone=True), server_default=func.now())
     source = Column(Text)
-    meta_data = Column(JSONB, server_default="{}")
+    meta_data = Column(JSONB().with_variant(JSON, "sqlite"), server_default="{}")
     date_created = Column(DateTime(timezone=True), server_default=func.now())
     s3_location = Column(Text)
     status = Column(Text, server_default="UNKNOWN")
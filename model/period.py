@@ -0,0 +1,23 @@
+from collections import namedtuple
+from datetime import date
+
+# Reporting window; start/end are inclusive timestamps as used in the filters.
+# A period with no start/end is unbounded (all rows).
+Period = namedtuple("Period", ["label", "start", "end"])
+
+def quarter_period(year, quarter) -> Period:
+    first_month = 3 * (quarter - 1) + 1
+    start = date(year, first_month, 1)
+    end = date(year + 1, 1, 1) if quarter == 4 else date(year, first_month + 3, 1)
+    last_day = date.fromordinal(end.toordinal() - 1)
+    return Period(f"Q{quarter} {year}", f"{start} 00:00:00", f"{last_day} 23:59:59")
+
+def quarter_periods(day) -> list:
+    # Current quarter, previous quarter and the same quarter a year earlier
+    quarter = (day.month - 1) // 3 + 1
+    previous_year, previous_quarter = (day.year - 1, 4) if quarter == 1 else (day.year, quarter - 1)
+    return [
+        quarter_period(day.year, quarter),
+        quarter_period(previous_year, previous_quarter),
+        quarter_period(day.year - 1, quarter),
+    ]
@@ -0,0 +1,132 @@
+from html import escape
+import csv
+import json
+
+from model.frame import ResultFrame
+
+# Lightweight alternatives to the pptx deck. Every backend takes the collected
+# report (metric name -> frame, or list of frames), the deck sections as
+# (title, table, table2, graph) frames and a text stream to write to.
+
+SERIES_COLORS = ["#f56924", "#004263", "#7f7f7f", "#70ad47"]
+
+def json_default(value):
+    if isinstance(value, ResultFrame):
+        return value.to_records()
+    return str(value)
+
+def csv_value(value):
+    # List cells (e.g. the jobs of a duplicate group) as JSON arrays, so values containing commas survive
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return json.dumps(value)
+    return value
+
+def metric_frames(report):
+    # Flatten multi-frame metrics (e.g. the SLA table and its summary) to name.index
+    for name, value in report.items():
+        if isinstance(value, ResultFrame):
+            yield name, value
+        elif isinstance(value, (list, tuple)):
+            for idx, frame in enumerate(value):
+                if isinstance(frame, ResultFrame):
+                    yield f"{name}.{idx}", frame
+
+def render_json(report, sections, out):
+    json.dump(report, out, default=json_default)
+
+def render_csv(report, sections, out):
+    # Long format so metrics with different columns share one file
+    writer = csv.writer(out)
+    writer.writerow(["metric", "row", "column", "value"])
+    for name, frame in metric_frames(report):
+        headers = frame.headers
+        for row_idx, row in enumerate(frame.rows()):
+            for column, value in zip(headers, row):
+                writer.writerow([name, row_idx, column, csv_value(value)])
+
+def stream_csv(headers, frames, out):
+    # Frames with the same columns (e.g. pages of one query), written as they come
+    writer = csv.writer(out)
+    writer.writerow(headers)
+    rows = 0
+    for frame in frames:
+        for row in frame.rows():
+            writer.writerow([csv_value(value) for value in row])
+        rows += len(frame)
+    return rows
+
+def html_table(frame):
+    numeric = [column.type in (int, float) for column in frame.columns]
+    head = "".join(f"<th>{escape(header)}</th>" for header in frame.headers)
+    body = []
+    for row in frame.rows():
+        cells = "".join(
+            f'<td class="num">{value:,.0f}</td>' if is_numeric and value is not None
+            else f"<td>{escape(', '.join(map(str, value)) if isinstance(value, list) else str(value))}</td>"
+            for is_numeric, value in zip(numeric, row)
+        )
+        body.append(f"<tr>{cells}</tr>")
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{''.join(body)}</tbody></table>"
+
+def svg_bar_chart(frame, width=640, bar_height=14):
+    # Horizontal grouped bars: categories from the first column, one series per numeric column
+    categories = [str(value) for value in frame.column(0)]
+    series = [(column.name, frame.column(idx)) for idx, column in enumerate(frame.columns)
+              if idx > 0 and column.type in (int, float)]
+    if not categories or not series:
+        return ""
+
+    label_width, legend_height = 180, 24
+    group_height = bar_height * len(series) + 8
+    height = legend_height + group_height * len(categories)
+    top = max((value or 0) for _, values in series for value in values) or 1
+    scale = (width - label_width - 60) / top
+
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-family="Arial" font-size="11">']
+    for idx, (name, _) in enumerate(series):
+        color = SERIES_COLORS[idx % len(SERIES_COLORS)]
+        parts.append(f'<rect x="{label_width + idx * 120}" y="6" width="10" height="10" fill="{color}"/>'
+                     f'<text x="{label_width + idx * 120 + 14}" y="15">{escape(name)}</text>')
+    for row, category in enumerate(categories):
+        y = legend_height + row * group_height
+        parts.append(f'<text x="{label_width - 6}" y="{y + group_height / 2}" text-anchor="end">{escape(category[:30])}</text>')
+        for idx, (_, values) in enumerate(series):
+            value = values[row] or 0
+            bar_y = y + idx * bar_height
+            color = SERIES_COLORS[idx % len(SERIES_COLORS)]
+            parts.append(f'<rect x="{label_width}" y="{bar_y}" width="{value * scale:.1f}" height="{bar_height - 2}" fill="{color}"/>'
+                         f'<text x="{label_width + value * scale + 4:.1f}" y="{bar_y + bar_height - 4}">{value:,}</text>')
+    parts.append("</svg>")
+    return "".join(parts)
+
+def section_frames(data):
+    if isinstance(data, ResultFrame):
+        return [data]
+    return [frame for frame in data or [] if isinstance(frame, ResultFrame)]
+
+def render_html(report, sections, out):
+    out.write(
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Status Report</title><style>"
+        "body{font-family:Arial,sans-serif;margin:2em;color:#000}"
+        "table{border-collapse:collapse;margin:1em 0}"
+        "th,td{border:1px solid #999;padding:4px 10px;text-align:left}"
+        "td.num{text-align:right}th{background:#cfc}"
+        "</style></head><body><h1>Status Report</h1>"
+    )
+    for title, table_data, table_data2, table_graph in sections:
+        out.write(f"<section><h2>{escape(title)}</h2>")
+        for frame in section_frames(table_data) + section_frames(table_data2):
+            out.write(html_table(frame))
+        graph_frames = section_frames(table_graph)
+        if graph_frames:
+            out.write(svg_bar_chart(graph_frames[0]))
+        out.write("</section>")
+    out.write("</body></html>")
+
+OUTPUT_BACKENDS = {
+    "json": render_json,
+    "csv": render_csv,
+    "html": render_html,
+}
@@ -0,0 +1,116 @@
+from io import BytesIO
+from xml.sax.saxutils import escape
+import zipfile
+
+from pptx.chart.data import CategoryChartData
+from pptx.chart.xlsx import CategoryWorkbookWriter
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.parts.chart import ChartPart
+from pptx.util import lazyproperty
+
+# How each chart's embedded Excel workbook ("Edit Data" in PowerPoint) is produced:
+#   full    - python-pptx/XlsxWriter workbook (default)
+#   minimal - small hand-written workbook with just the chart data
+#   none    - no embedded workbook, the chart keeps its cached values only
+CHART_WORKBOOK_MODES = ("full", "minimal", "none")
+
+SPREADSHEET_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+RELATIONSHIP_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+MINIMAL_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<workbook xmlns="{SPREADSHEET_NS}" xmlns:r="{RELATIONSHIP_NS}">'
+        '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+def cell_xml(ref, value):
+    if value is None:
+        return ""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    return f'<c r="{ref}" t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
+
+class MinimalCategoryWorkbookWriter(CategoryWorkbookWriter):
+    # Same sheet layout (and so the same chart references) as CategoryWorkbookWriter,
+    # written directly as XML instead of through XlsxWriter.
+    @property
+    def xlsx_blob(self):
+        categories = self._chart_data.categories
+        if categories.depth != 1:
+            return super().xlsx_blob
+
+        series_list = list(self._chart_data)
+        columns = [self._column_reference(2 + idx) for idx in range(len(series_list))]
+        rows = ['<row r="1">' + "".join(cell_xml(f"{col}1", series.name)
+                                        for col, series in zip(columns, series_list)) + "</row>"]
+        labels = [category.label for category in categories]
+        for idx in range(max([len(labels)] + [len(series) for series in series_list])):
+            row = idx + 2
+            cells = cell_xml(f"A{row}", labels[idx] if idx < len(labels) else None)
+            for col, series in zip(columns, series_list):
+                cells += cell_xml(f"{col}{row}", series.values[idx] if idx < len(series) else None)
+            rows.append(f'<row r="{row}">{cells}</row>')
+
+        sheet = (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            f'<worksheet xmlns="{SPREADSHEET_NS}"><sheetData>{"".join(rows)}</sheetData></worksheet>'
+        )
+        xlsx_file = BytesIO()
+        with zipfile.ZipFile(xlsx_file, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as xlsx:
+            for name, xml in MINIMAL_PARTS.items():
+                xlsx.writestr(name, xml)
+            xlsx.writestr("xl/worksheets/sheet1.xml", sheet)
+        return xlsx_file.getvalue()
+
+class MinimalCategoryChartData(CategoryChartData):
+    @lazyproperty
+    def _workbook_writer(self):
+        return MinimalCategoryWorkbookWriter(self)
+
+def new_chart_data(workbook="full"):
+    if workbook not in CHART_WORKBOOK_MODES:
+        raise ValueError(f"chart workbook must be one of {CHART_WORKBOOK_MODES}")
+    return MinimalCategoryChartData() if workbook == "minimal" else CategoryChartData()
+
+def add_chart(shapes, chart_type, x, y, cx, cy, chart_data, workbook="full"):
+    if workbook != "none":
+        return shapes.add_chart(chart_type, x, y, cx, cy, chart_data)
+
+    # SlideShapes.add_chart without ChartWorkbook.update_from_xlsx_blob(): the chart
+    # part gets no c:externalData, so PowerPoint shows it but can't "Edit Data"
+    slide_part = shapes.part
+    package = slide_part.package
+    chart_part = ChartPart.load(
+        package.next_partname(ChartPart.partname_template),
+        CT.DML_CHART,
+        package,
+        chart_data.xml_bytes(chart_type),
+    )
+    rId = slide_part.relate_to(chart_part, RT.CHART)
+    graphic_frame = shapes._add_chart_graphicFrame(rId, x, y, cx, cy)
+    shapes._recalculate_extents()
+    return shapes._shape_factory(graphic_frame)
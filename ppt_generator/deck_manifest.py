@@ -0,0 +1,58 @@
+from hashlib import sha256
+import json
+import logging
+import os
+
+from ppt_generator.backends import json_default
+
+# Sidecar manifest for incremental deck regeneration: for every section of the
+# last written deck, its title, a hash of its input data and how many slides it
+# produced (sections own consecutive slides, in deck order). A section whose hash
+# is unchanged on the next run keeps its slides (and their chart parts) as-is.
+
+# Bump when slide rendering changes so every section of existing decks is re-rendered
+RENDER_VERSION = 1
+
+def manifest_path(deck_path) -> str:
+    return f"{deck_path}.sections.json"
+
+def deck_hash(deck_path) -> str:
+    digest = sha256()
+    with open(deck_path, "rb") as deck:
+        for block in iter(lambda: deck.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def section_hash(section) -> str:
+    # section is (title, table_data, table_data2, table_graph)
+    payload = json.dumps(section, default=json_default, sort_keys=True)
+    return sha256(payload.encode("utf-8")).hexdigest()
+
+def load_manifest(deck_path, chart_workbook, slide_count=None):
+    # None when there is no usable manifest; the deck is then rendered in full
+    try:
+        with open(manifest_path(deck_path), encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logging.warning("ignoring unreadable deck manifest: %s", e)
+        return None
+
+    if manifest.get("render_version") != RENDER_VERSION or manifest.get("chart_workbook") != chart_workbook:
+        return None
+    if slide_count is not None and sum(entry["slides"] for entry in manifest["sections"]) != slide_count:
+        return None
+    if manifest.get("deck_sha256") != deck_hash(deck_path):
+        # The deck was edited or replaced since the manifest was written
+        return None
+    return manifest
+
+def write_manifest(deck_path, chart_workbook, sections):
+    # sections: [{"title", "hash", "slides"}] in deck order
+    manifest = {"render_version": RENDER_VERSION, "chart_workbook": chart_workbook,
+                "deck_sha256": deck_hash(deck_path), "sections": sections}
+    tmp_path = f"{manifest_path(deck_path)}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    os.replace(tmp_path, manifest_path(deck_path))
@@ -1,19 +1,20 @@
 from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN, MSO_ANCHOR,  MSO_VERTICAL_ANCHOR
-from pptx.chart.data import CategoryChartData
 from pptx.enum.chart import XL_CHART_TYPE, XL_LEGEND_POSITION
 from pptx.dml.color import RGBColor
 from pptx.enum.shapes import MSO_SHAPE
+from ppt_generator.chart_workbook import new_chart_data, add_chart
 
 class ppt:
     MAX_CONTENT_HEIGHT = Inches(7.0)      # usable vertical space
     DEFAULT_TOP_OFFSET = Inches(0.5)      # starting top margin
     ELEMENT_SPACING = Inches(0.2)         # space between elements
 
-    def __init__(self, filename):
+    def __init__(self, filename, chart_workbook="full", template=None):
         self.filename = filename
-        self.prs = Presentation()
+        self.chart_workbook = chart_workbook  # see chart_workbook.CHART_WORKBOOK_MODES
+        self.prs = Presentation(template)     # template: previous deck to update in place
         self.current_slide = None
         self.chart_type = XL_CHART_TYPE.BAR_CLUSTERED
         self.slide_top_offset = self.DEFAULT_TOP_OFFSET
@@ -23,6 +24,23 @@ class ppt:
         self.current_slide = self.prs.slides.add_slide(self.prs.slide_layouts[6])
         self.slide_top_offset = self.DEFAULT_TOP_OFFSET
 
+    def slide_ids(self):
+        return [slide.slide_id for slide in self.prs.slides]
+
+    def drop_slides(self, slide_ids):
+        # Unlinked slide parts, and the chart parts only they reference, are left out on save
+        slide_list = self.prs.slides._sldIdLst
+        for sldId in list(slide_list.sldId_lst):
+            if sldId.id in slide_ids:
+                slide_list.remove(sldId)
+                self.prs.part.drop_rel(sldId.rId)
+
+    def order_slides(self, slide_ids):
+        slide_list = self.prs.slides._sldIdLst
+        by_id = {sldId.id: sldId for sldId in slide_list.sldId_lst}
+        for slide_id in slide_ids:
+            slide_list.append(by_id[slide_id])  # moves the element to the end
+
     def ensure_space(self, element_height):
         if self.current_slide is None or (self.slide_top_offset + element_height > self.MAX_CONTENT_HEIGHT):
             self.add_slide()
@@ -50,7 +68,7 @@ class ppt:
         if not data:
             return
 
-        headers = list(data[0].keys())
+        headers = data.headers
         rows = len(data) + 1
         cols = len(headers)
         row_height = 0.3
@@ -71,31 +89,65 @@ class ppt:
             p.alignment = PP_ALIGN.CENTER
             p.font.size = Pt(18)
 
-        for row_idx, row_data in enumerate(data, start=1):
-            for col_idx, key in enumerate(headers):
+        numeric = [column.type in (int, float) for column in data.columns]
+        for row_idx, row_data in enumerate(data.rows(), start=1):
+            for col_idx, value in enumerate(row_data):
                 cell = table.cell(row_idx, col_idx)
-                if isinstance(row_data[key], (int, float)):
-                    cell.text = f"{row_data[key]:,.0f}"  # No decimal places
+                if numeric[col_idx] and value is not None:
+                    cell.text = f"{value:,.0f}"  # No decimal places
                 else:
-                    cell.text = str(row_data[key])
+                    cell.text = str(value)
                 p = cell.text_frame.paragraphs[0]
                 p.alignment = PP_ALIGN.CENTER if col_idx == 1 else PP_ALIGN.LEFT
 
         self.slide_top_offset += table_height + Inches(1)  
 
-    def add_graph(self, data):
+    def add_appendix_table(self, data, list_items=3):
+        # Dense drill-down table: small font, long list cells cut to the first few items
         if not data:
             return
 
-        headers = list(data[0].keys())
-        label_key, value_key = headers[0], headers[1]
+        row_height = 0.4
+        table_height = Inches(0.4 + row_height * len(data))
+        self.ensure_space(table_height)
 
-        categories = [d[label_key] for d in data]
-        values = [d[value_key] for d in data]
+        left = Inches(0.3)
+        width = Inches(9.4)
+        top = self.slide_top_offset
+        table = self.current_slide.shapes.add_table(len(data) + 1, len(data.headers), left, top, width, table_height).table
 
-        chart_data = CategoryChartData()
-        chart_data.categories = categories
-        chart_data.add_series(value_key, values)
+        for col_idx, header in enumerate(data.headers):
+            cell = table.cell(0, col_idx)
+            cell.text = header
+            p = cell.text_frame.paragraphs[0]
+            p.alignment = PP_ALIGN.CENTER
+            p.font.size = Pt(11)
+
+        numeric = [column.type in (int, float) for column in data.columns]
+        for row_idx, row_data in enumerate(data.rows(), start=1):
+            for col_idx, value in enumerate(row_data):
+                if numeric[col_idx] and value is not None:
+                    text = f"{value:,.0f}"
+                else:
+                    items = value if isinstance(value, list) else [str(value or "")]
+                    text = ", ".join(map(str, items[:list_items]))
+                    if len(items) > list_items:
+                        text += f" +{len(items) - list_items} more"
+                cell = table.cell(row_idx, col_idx)
+                cell.text = text
+                p = cell.text_frame.paragraphs[0]
+                p.alignment = PP_ALIGN.RIGHT if numeric[col_idx] else PP_ALIGN.LEFT
+                p.font.size = Pt(9)
+
+        self.slide_top_offset += table_height + self.ELEMENT_SPACING
+
+    def add_graph(self, data):
+        if not data:
+            return
+
+        chart_data = new_chart_data(self.chart_workbook)
+        chart_data.categories = data.column(0)
+        chart_data.add_series(data.headers[1], data.column(1))
 
         chart_height = Inches(4)
         chart_width = Inches(6)
@@ -107,7 +159,7 @@ class ppt:
         cx = chart_width
         cy = chart_height
 
-        self.current_slide.shapes.add_chart(self.chart_type, x, y, cx, cy, chart_data)
+        add_chart(self.current_slide.shapes, self.chart_type, x, y, cx, cy, chart_data, self.chart_workbook)
         self.slide_top_offset += chart_height + self.ELEMENT_SPACING
 
     def jobs_cancelled_add_graph(self,data, chart_type=XL_CHART_TYPE.COLUMN_CLUSTERED):
@@ -118,22 +170,19 @@ class ppt:
             self.add_slide()
 
         #headers
-        headers = list(data[0].keys())
+        headers = data.headers
         if len(headers) < 3:
-            raise ValueError("Data must contain at least three keys per dictionary.")
+            raise ValueError("Data must contain at least three columns.")
 
-        date_key, job_key, cancelled_key = headers[0], headers[1], headers[2]
+        job_key, cancelled_key = headers[1], headers[2]
 
         #data
-        try:
-            categories = [d[date_key] for d in data]
-            job_total = [d[job_key] for d in data]
-            job_cancelled = [d[cancelled_key] for d in data]
-        except KeyError as e:
-            raise ValueError(f"Key '{e.args[0]}' not found in data items.")
+        categories = data.column(0)
+        job_total = data.column(1)
+        job_cancelled = data.column(2)
 
         #chart data
-        chart_data = CategoryChartData()
+        chart_data = new_chart_data(self.chart_workbook)
         chart_data.categories = categories
         cancelled_total = sum(job_cancelled)
         job_total_sum = sum(job_total)
@@ -144,7 +193,7 @@ class ppt:
 
         #chart positioning
         x, y, cx, cy = Inches(0.5), Inches(1), Inches(9), Inches(5.5)
-        chart_frame = self.current_slide.shapes.add_chart(chart_type, x, y, cx, cy, chart_data)
+        chart_frame = add_chart(self.current_slide.shapes, chart_type, x, y, cx, cy, chart_data, self.chart_workbook)
         chart = chart_frame.chart
 
         left, top, width, height = Inches(6.5), Inches(6.2), Inches(3), Inches(1.2)
@@ -234,25 +283,17 @@ class ppt:
         if not self.current_slide:
             self.add_slide()
 
-        headers = list(data[0][0].keys())
-        jobs = list(data[1][0].values())
+        headers = data[0].headers
 
-        if len(headers) < 2:
-            raise ValueError("Data must contain at least two keys per dictionary.")
-
-        label_key, value_key = headers[0], headers[2]
-        try:
-            categories = [d[label_key] for d in data[0]]
-            values = [d[value_key] for d in data[0]]
-        except KeyError as e:
-            raise ValueError(f"Key '{e.args[0]}' not found in data items.")
+        if len(headers) < 3:
+            raise ValueError("Data must contain at least three columns.")
 
-        chart_data = CategoryChartData()
-        chart_data.categories = categories
-        chart_data.add_series(value_key, values)
+        chart_data = new_chart_data(self.chart_workbook)
+        chart_data.categories = data[0].column(0)
+        chart_data.add_series(headers[2], data[0].column(2))
 
         x, y, cx, cy = Inches(1), Inches(1), Inches(8), Inches(6)
-        chart_frame = self.current_slide.shapes.add_chart(chart_type, x, y, cx, cy, chart_data)
+        chart_frame = add_chart(self.current_slide.shapes, chart_type, x, y, cx, cy, chart_data, self.chart_workbook)
         chart = chart_frame.chart
         #adds value at the top of graph
         for series in chart.series:
@@ -269,7 +310,7 @@ class ppt:
             return
         
         rows = len(data[0]) + 1
-        cols = len(data[0][0])
+        cols = len(data[0].columns)
         left = Inches(0.5)
         top = Inches(1.5)
         width = Inches(9)
@@ -278,7 +319,7 @@ class ppt:
         table = self.current_slide.shapes.add_table(rows, cols, left, top, width, height).table
 
         #Header
-        headers = list(data[0][0].keys())
+        headers = data[0].headers
         for col_idx, header in enumerate(headers):
             cell = table.cell(0, col_idx)
             cell.text = header
@@ -287,14 +328,15 @@ class ppt:
             p.font.size = Pt(18)
 
         #Rows
-        for row_idx, row_data in enumerate(data[0], start=1):
-            for col_idx, key in enumerate(headers):
+        numeric = [column.type in (int, float) for column in data[0].columns]
+        for row_idx, row_data in enumerate(data[0].rows(), start=1):
+            for col_idx, value in enumerate(row_data):
                 cell = table.cell(row_idx, col_idx)
 
-                if isinstance(row_data[key], (int, float)):
-                    cell.text = f"{row_data[key]:,.0f}"
+                if numeric[col_idx] and value is not None:
+                    cell.text = f"{value:,.0f}"
                 else:
-                    cell.text = str(row_data[key])
+                    cell.text = str(value)
 
                 p = cell.text_frame.paragraphs[0]
 
@@ -308,11 +350,7 @@ class ppt:
         summary_left = left
         summary_width = Inches(4)
         summary_height = Inches(2)
-        jobs = list(data[1][0].values())
-
-
-
-
+        jobs = next(data[1].rows())
 
         def add_label_value_line(text_frame, label, value):
             p = text_frame.add_paragraph()
@@ -362,7 +400,8 @@ class ppt:
         add_label_value_line(text_frame, "(includes duplicate hash jobs)", "")
         add_label_value_line(text_frame, "Jobs Done Within SLA: ", f"{jobs[1]:,}")
         add_label_value_line(text_frame, "Jobs Done Outside SLA: ", f"{jobs[0] - jobs[1]:,}")
-        add_label_value_line(text_frame, "Overall SLA Compliance: ", f"{(jobs[1]/jobs[0])*100:.2f}%")
+        compliance = f"{(jobs[1]/jobs[0])*100:.2f}%" if jobs[0] else "N/A"
+        add_label_value_line(text_frame, "Overall SLA Compliance: ", compliance)
 
         note_left = summary_left + summary_width + Pt(20)
         note_top = summary_top
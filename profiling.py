@@ -0,0 +1,186 @@
+from collections import Counter
+from contextlib import contextmanager
+import cProfile
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+class StackSampler(threading.Thread):
+    # Samples the Python stacks of all threads (fetch workers included) at a fixed
+    # interval and writes the counts in folded format (flamegraph.pl, speedscope,
+    # inferno), each stack rooted at its thread name.
+    def __init__(self, interval=0.005):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == self.ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                if stack:
+                    stack.append(names.get(thread_id, str(thread_id)))
+                    self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def write(self, path):
+        with open(path, "w") as folded:
+            for stack, count in self.stacks.most_common():
+                folded.write(f"{stack} {count}\n")
+
+class Profiler(object):
+    # Records wall time, CPU time (of the phase's thread) and peak traced memory per named phase.
+    # Phases nest, e.g. "render: Jobs by Priority > chart", and may run on several threads.
+    # tracemalloc is process-wide, so a phase's peak is the process peak while it ran,
+    # which includes phases overlapping it on other threads. Disabled by default.
+    def __init__(self):
+        self.enabled = False
+        self.cprofile_path = None
+        self.flamegraph_path = None
+        self.phases = []
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.active = {}
+        self.started_phases = 0
+        self.cprofile = None
+        self.thread_profiles = []
+        self.sampler = None
+
+    @property
+    def stack(self) -> list:
+        # Nesting is tracked per thread
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+        return self.local.stack
+
+    def configure(self, enabled=False, cprofile_path=None, flamegraph_path=None):
+        self.enabled = enabled or bool(cprofile_path or flamegraph_path)
+        self.cprofile_path = cprofile_path
+        self.flamegraph_path = flamegraph_path
+
+    def start(self):
+        if not self.enabled:
+            return
+        self.phases = []
+        self.active = {}
+        self.started_phases = 0
+        tracemalloc.start()
+        if self.flamegraph_path:
+            self.sampler = StackSampler()
+            self.sampler.start()
+        if self.cprofile_path:
+            self.thread_profiles = []
+            if sys.version_info < (3, 12):
+                # cProfile only sees the thread that enabled it before 3.12 (sys.monitoring
+                # makes it interpreter-wide since), so threads started from now get their own
+                threading.setprofile(self.profile_thread)
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    def stop(self):
+        if not self.enabled:
+            return
+        if self.cprofile:
+            self.cprofile.disable()
+            threading.setprofile(None)
+            stats = pstats.Stats(self.cprofile)
+            for profile in self.thread_profiles:
+                stats.add(profile)
+            stats.dump_stats(self.cprofile_path)
+            logging.info(f"cProfile stats written to {self.cprofile_path}")
+            self.cprofile = None
+        if self.sampler:
+            self.sampler.stop()
+            self.sampler.write(self.flamegraph_path)
+            logging.info(f"Folded stacks for flamegraph written to {self.flamegraph_path}")
+            self.sampler = None
+        tracemalloc.stop()
+
+    def profile_thread(self, *args):
+        # First profile event of a new thread: hand the thread to its own cProfile
+        profile = cProfile.Profile()
+        with self.lock:
+            self.thread_profiles.append(profile)
+        profile.enable()
+
+    def checkpoint(self):
+        # Fold the process peak since the last checkpoint into every running phase.
+        # Called under the lock at each phase start and end, so each interval between
+        # checkpoints lies wholly inside or outside any phase.
+        peak = tracemalloc.get_traced_memory()[1]
+        for entry in self.active.values():
+            entry["peak"] = max(entry["peak"], peak)
+        tracemalloc.reset_peak()
+
+    @contextmanager
+    def phase(self, name):
+        details = {}
+        if not self.enabled or not tracemalloc.is_tracing():
+            yield details
+            return
+
+        path = " > ".join([entry["phase"] for entry in self.stack] + [name])
+        with self.lock:
+            self.checkpoint()
+            entry = {"phase": name, "path": path, "depth": len(self.stack), "peak": 0,
+                     "id": self.started_phases, "parent": self.stack[-1]["id"] if self.stack else None}
+            self.started_phases += 1
+            self.active[entry["id"]] = entry
+        self.stack.append(entry)
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield details
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+            with self.lock:
+                self.checkpoint()
+                del self.active[entry["id"]]
+                self.phases.append({"id": entry["id"], "parent": entry["parent"],
+                                    "path": path, "depth": entry["depth"], "wall_s": wall,
+                                    "cpu_s": cpu, "peak_mb": entry["peak"] / 2 ** 20, **details})
+            self.stack.pop()
+
+    def summary(self) -> str:
+        lines = [f"{'phase':<60} {'wall s':>8} {'cpu s':>8} {'peak MB*':>8} {'slides':>6} {'reused':>6}"]
+        for item in self.ordered_phases():
+            label = "  " * item["depth"] + item["path"].split(" > ")[-1]
+            lines.append(f"{label[:60]:<60} {item['wall_s']:>8.3f} {item['cpu_s']:>8.3f} "
+                         f"{item['peak_mb']:>8.1f} {item.get('slides', ''):>6} {item.get('reused', ''):>6}")
+        lines.append("* process-wide traced peak while the phase ran (includes overlapping phases)")
+        return "\n".join(lines)
+
+    def ordered_phases(self) -> list:
+        # Phases are appended as they finish (children first); put parents before children
+        children = {}
+        for item in sorted(self.phases, key=lambda item: item["id"]):
+            children.setdefault(item["parent"], []).append(item)
+
+        ordered = []
+        def visit(parent):
+            for item in children.get(parent, []):
+                ordered.append(item)
+                visit(item["id"])
+        visit(None)
+        return ordered
+
+    def write_json(self, path):
+        with open(path, "w") as output:
+            json.dump(self.ordered_phases(), output, indent=2)
+
+profiler = Profiler()
@@ -0,0 +1,179 @@
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import Future
+from urllib.parse import urlparse, parse_qs
+from io import BytesIO, StringIO, TextIOWrapper
+import json
+import logging
+import os
+import threading
+import time
+
+import main
+from ppt_generator.backends import OUTPUT_BACKENDS, stream_csv
+
+PPTX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+CONTENT_TYPES = {
+    "json": "application/json",
+    "csv": "text/csv; charset=utf-8",
+    "html": "text/html; charset=utf-8",
+}
+class ReportCache(object):
+    # In-memory result cache. Concurrent requests for the same key while it is
+    # being computed wait on the one in-flight computation instead of starting their own.
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.results = {}
+        self.inflight = {}
+
+    def get(self, key, compute, refresh=False):
+        with self.lock:
+            cached = self.results.get(key)
+            if cached and not refresh and cached[0] > time.monotonic():
+                return cached[1]
+            future = self.inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self.inflight[key] = Future()
+
+        if not owner:
+            logging.info(f"Waiting on in-flight {key}")
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            with self.lock:
+                self.results[key] = (time.monotonic() + self.ttl, value)
+            return value
+        finally:
+            with self.lock:
+                del self.inflight[key]
+
+cache = ReportCache(float(os.environ.get("REPORT_CACHE_TTL", 300)))
+CHART_WORKBOOK = os.environ.get("REPORT_CHART_WORKBOOK", "full")
+
+def get_report(refresh=False):
+    def compute():
+        try:
+            logging.info("Collecting report metrics")
+            return main.collect_report()
+        finally:
+            # Hand the worker thread's connection back to the warm pool
+            main.release_session()
+    return cache.get("metrics", compute, refresh)
+
+def get_deck(refresh=False):
+    def compute():
+        stream = BytesIO()
+        main.render_report(get_report(refresh), stream, CHART_WORKBOOK)
+        return stream.getvalue()
+    return cache.get("deck", compute, refresh)
+
+def get_output(output_format, refresh=False):
+    # Text backends only, no pptx rendering
+    def compute():
+        report = get_report(refresh)
+        out = StringIO()
+        OUTPUT_BACKENDS[output_format](report, list(main.report_sections(report)), out)
+        return out.getvalue().encode("utf-8")
+    return cache.get(output_format, compute, refresh)
+
+def get_duplicate_counts(refresh=False):
+    # File counts of the largest duplicated groups (main.DUPLICATE_PAGE_SNAPSHOT of them),
+    # aggregated once per cache period; pages within them skip re-aggregating the file table
+    def compute():
+        try:
+            return main.duplicate_hash_counts()
+        finally:
+            main.release_session()
+    return cache.get("duplicate_counts", compute, refresh)
+
+def parse_page_key(after):
+    # "<files>:<md5>" -> (files, md5); ValueError when malformed
+    if not after:
+        return None
+    files, md5 = after.split(":", 1)
+    return int(files), md5
+
+def get_duplicates_page(after=None, limit=100, refresh=False):
+    # Keyset page: {"rows": [...], "next": "<files>:<md5>" or null}
+    counts = get_duplicate_counts(refresh)
+    try:
+        frame, next_key = main.duplicate_hash_page(after, limit, counts)
+        body = {"rows": frame.to_records(), "next": f"{next_key[0]}:{next_key[1]}" if next_key else None}
+        return json.dumps(body).encode("utf-8")
+    finally:
+        main.release_session()
+
+class ReportHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        refresh = query.get("refresh", ["0"])[0] == "1"
+        try:
+            if url.path in ("/metrics", "/report.json"):
+                self.send_body(200, CONTENT_TYPES["json"], get_output("json", refresh))
+            elif url.path in ("/report.csv", "/report.html"):
+                output_format = url.path.rsplit(".", 1)[1]
+                self.send_body(200, CONTENT_TYPES[output_format], get_output(output_format, refresh))
+            elif url.path == "/deck":
+                self.send_body(200, PPTX_CONTENT_TYPE, get_deck(refresh),
+                               {"Content-Disposition": 'attachment; filename="status_report.pptx"'})
+            elif url.path == "/duplicates.json":
+                try:
+                    after = parse_page_key(query.get("after", [None])[0])
+                    limit = max(1, min(int(query.get("limit", ["100"])[0]), 1000))
+                except ValueError:
+                    self.send_body(400, "text/plain", b"after must be <files>:<md5>, limit an integer")
+                    return
+                self.send_body(200, CONTENT_TYPES["json"], get_duplicates_page(after, limit, refresh))
+            elif url.path == "/duplicates.csv":
+                self.stream_duplicates_csv()
+            elif url.path == "/health":
+                self.send_body(200, "text/plain", b"ok")
+            else:
+                self.send_body(404, "text/plain", b"not found")
+        except Exception:
+            logging.error(f"error serving {self.path}", exc_info=True)
+            self.send_body(500, "text/plain", b"report failed")
+
+    def stream_duplicates_csv(self):
+        # No Content-Length: the HTTP/1.0 response ends when the connection closes
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPES["csv"])
+        self.send_header("Content-Disposition", 'attachment; filename="duplicate_hashes.csv"')
+        self.end_headers()
+        out = TextIOWrapper(self.wfile, encoding="utf-8", newline="", write_through=True)
+        try:
+            stream_csv([name for name, _ in main.DUPLICATE_HASH_COLUMNS], main.iter_duplicate_hashes(), out)
+        finally:
+            out.detach()
+            main.release_session()
+
+    def send_body(self, status, content_type, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.info(f"{self.address_string()} {format % args}")
+
+def serve():
+    host = os.environ.get("REPORT_SERVER_HOST", "127.0.0.1")
+    port = int(os.environ.get("REPORT_SERVER_PORT", 8765))
+    httpd = ThreadingHTTPServer((host, port), ReportHandler)
+    logging.info(f"Report server listening on http://{host}:{port} (/metrics, /report.html, /report.csv, /deck, /duplicates.json)")
+    httpd.serve_forever()
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,19 @@
+import pytest
+
+import main
+from database.conn import DBManager
+from database.metrics_store import MetricsStore
+from database.shard import ShardExecutor
+
+@pytest.fixture
+def use_database(monkeypatch):
+    # Points main's lazily opened database, metrics store and shard executor at
+    # connection (one URL or a shard list) for the rest of the test
+    def use(connection, store_path):
+        manager = DBManager(connection)
+        monkeypatch.setattr(main, "db", main.Lazy(lambda: manager))
+        monkeypatch.setattr(main, "session", main.Lazy(lambda: manager.DBSession))
+        monkeypatch.setattr(main, "metrics_store", main.Lazy(lambda: MetricsStore(str(store_path), source=manager.fingerprint)))
+        monkeypatch.setattr(main, "shards", main.Lazy(lambda: ShardExecutor(manager.shard_sessions)))
+        return manager
+    return use
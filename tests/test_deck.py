@@ -0,0 +1,77 @@
+import zipfile
+
+from pptx import Presentation
+
+import main
+from model.frame import ResultFrame
+
+# Incremental regeneration splices the previous deck: unchanged sections keep their
+# slides, changed ones are rendered again and their old slides and charts dropped.
+
+def sample_report(received=(3, 2)):
+    return {
+        "exception_result": ResultFrame([("status", str), ("Q2 2025", int)], [("ERR", 3), ("TOTAL", 3)]),
+        "status_data": ResultFrame([("Title", str), ("Count", int)], [("Total Files", 10), ("Null Files", 0)]),
+        "duplicate_status": ResultFrame([("Duplicates", str), ("Q2 2025", int)], [("web", 5), ("TOTAL", 5)]),
+        "source_category_summary": ResultFrame([("SourceCategory", str), ("Job Count", int)], [("web", 1500)]),
+        "job_done_with_SLA": [
+            ResultFrame([("Priority", int), ("SLA(hrs)", str), ("Job Count", int)], [(3, "60hrs", 5), (1, ">84hrs", 2)]),
+            ResultFrame([("job_done", int), ("job_done_within_SLA", int)], [(4, 2)]),
+        ],
+        "total_job_count": ResultFrame([("DATE", str), ("TOTAL", int), ("CANCELLED", int)],
+                                       [("Sep 1 - Sep 8", received[0], 1), ("Sep 8 - Sep 15", received[1], 0)]),
+    }
+
+def slide_texts(path):
+    return [[shape.text_frame.text for shape in slide.shapes if shape.has_text_frame]
+            for slide in Presentation(path).slides]
+
+def slide_ids(path):
+    return [slide.slide_id for slide in Presentation(path).slides]
+
+def chart_parts(path):
+    with zipfile.ZipFile(path) as deck:
+        return sorted(name for name in deck.namelist() if name.startswith(("ppt/charts/chart", "ppt/embeddings/")))
+
+def section_slides(path):
+    # Slide ids per section title, from the deck's manifest
+    manifest = main.load_manifest(path, "full")
+    ids, offset, sections = slide_ids(path), 0, {}
+    for entry in manifest["sections"]:
+        sections[entry["title"]] = ids[offset:offset + entry["slides"]]
+        offset += entry["slides"]
+    return sections
+
+def test_incremental_render_reuses_unchanged_sections(tmp_path):
+    deck = str(tmp_path / "deck.pptx")
+    main.render_report(sample_report(), deck, "full", incremental=True)
+    before = section_slides(deck)
+
+    main.render_report(sample_report(received=(30, 20)), deck, "full", incremental=True)
+    after = section_slides(deck)
+
+    changed = "Job Received Count"
+    assert list(after) == list(before)
+    assert all(after[title] == before[title] for title in before if title != changed)
+    assert not set(after[changed]) & set(before[changed])
+
+    # Same slides, in the same order, and no chart parts left over from the old section
+    fresh = str(tmp_path / "fresh.pptx")
+    main.render_report(sample_report(received=(30, 20)), fresh, "full")
+    assert slide_texts(deck) == slide_texts(fresh)
+    assert len(chart_parts(deck)) == len(chart_parts(fresh))
+
+def test_edited_deck_is_rendered_in_full(tmp_path):
+    deck = str(tmp_path / "deck.pptx")
+    main.render_report(sample_report(), deck, "full", incremental=True)
+    expected = slide_texts(deck)
+
+    # Same slide count, different bytes: the manifest's deck hash no longer matches
+    edited = Presentation(deck)
+    next(shape for shape in edited.slides[0].shapes if shape.has_text_frame).text_frame.text = "edited"
+    edited.save(deck)
+    assert main.load_manifest(deck, "full") is None
+
+    main.render_report(sample_report(), deck, "full", incremental=True)
+    assert slide_texts(deck) == expected
+    assert main.load_manifest(deck, "full") is not None
@@ -0,0 +1,67 @@
+import re
+from datetime import date, timedelta
+
+import pytest
+
+import main
+from database.metrics_store import MetricsStore
+from database.seed import seed
+
+METRIC = "job_received_daily"
+WEEKS = 8
+
+@pytest.fixture
+def jobs_database(tmp_path, use_database):
+    url = f"sqlite:///{tmp_path / 'jobs.db'}"
+    seed(url, jobs=300, users=2, days=7 * WEEKS)
+    return use_database(url, tmp_path / "store.db")
+
+def received_days():
+    today = date.today()
+    return [str(today - timedelta(days=n)) for n in range(7 * WEEKS, -1, -1)]
+
+def run_received_jobs():
+    # The weekly frame and the first day the query asked the database for
+    first_days = []
+
+    def execute(queries):
+        for query in queries:
+            params = query.statement.compile().params.values()
+            first_days.extend(value[:10] for value in params
+                              if isinstance(value, str) and re.fullmatch(r"\d{4}-\d\d-\d\d 00:00:00", value))
+        return [query.all() for query in queries]
+
+    frame = main.run_queries(main.fetch_total_and_cancelled_jobs(weeks=WEEKS), execute)
+    return list(frame.rows()), first_days
+
+def test_closed_days_are_reused_open_and_missing_days_queried(jobs_database, tmp_path):
+    days = received_days()
+    store = MetricsStore(str(tmp_path / "store.db"), source=jobs_database.fingerprint)
+
+    rows, first_days = run_received_jobs()
+    assert first_days == [days[0]]
+    assert sorted(store.get(METRIC, days)) == days[:-main.OPEN_DAYS]
+
+    # Only the open days are queried again
+    rerun_rows, first_days = run_received_jobs()
+    assert first_days == [days[-main.OPEN_DAYS]]
+    assert rerun_rows == rows
+
+    # A gap in the stored days is queried from its first missing day
+    store.conn.execute("DELETE FROM source_metric_period WHERE period = ?", [days[10]])
+    store.conn.commit()
+    gap_rows, first_days = run_received_jobs()
+    assert first_days == [days[10]]
+    assert gap_rows == rows
+    assert days[10] in store.get(METRIC, days)
+
+def test_stored_days_are_kept_per_database(jobs_database, tmp_path):
+    run_received_jobs()
+    other = MetricsStore(str(tmp_path / "store.db"), source="another database")
+    assert other.get(METRIC, received_days()) == {}
+    other.put(METRIC, {received_days()[0]: {"total": 99, "cancelled": 0}})
+
+    # The other database's value is neither read nor overwritten
+    rows, first_days = run_received_jobs()
+    assert first_days == [received_days()[-main.OPEN_DAYS]]
+    assert other.get(METRIC, received_days()[:1]) == {received_days()[0]: {"total": 99, "cancelled": 0}}
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+import main
+from database.seed import seed
+from model.models import Base
+from ppt_generator.backends import json_default
+
+def unavailable_database():
+    raise ValueError("invalid literal for int() with base 10: 'notaport'")
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_report_without_database_finishes_empty(monkeypatch, batch):
+    # Every fetcher fails and the run still ends instead of waiting on its results
+    monkeypatch.setattr(main, "db", main.Lazy(unavailable_database))
+    monkeypatch.setattr(main, "session", main.Lazy(lambda: main.db.DBSession))
+    monkeypatch.setattr(main, "shards", main.Lazy(lambda: main.ShardExecutor(main.db.shard_sessions)))
+    results = dict(main.fetch_metrics(batch=batch))
+    assert set(results) == set(main.REPORT_METRICS)
+    assert all(result in ([], None) for result in results.values())
+
+def test_user_report_matches_single_run_over_their_rows(tmp_path, use_database):
+    # A user's report from a by_user run has the same sections and values as a single
+    # run over a database holding only that user's rows, including empty sections
+    url = f"sqlite:///{tmp_path / 'jobs.db'}"
+    seed(url, jobs=200, users=3, days=60)
+    use_database(url, tmp_path / "store.db")
+    reports = main.split_report_by_user(main.collect_report(by_user=True))
+    assert set(reports) == {"user0", "user1", "user2"}
+
+    manager = use_database(f"sqlite:///{tmp_path / 'user1.db'}", tmp_path / "user1_store.db")
+    Base.metadata.create_all(manager.engine)
+    with manager.engine.begin() as connection:
+        connection.exec_driver_sql(f"ATTACH DATABASE '{tmp_path / 'jobs.db'}' AS full")
+        for table in Base.metadata.sorted_tables:
+            where = "" if table.name == "status" else " WHERE user = 'user1'"
+            connection.exec_driver_sql(f"INSERT INTO {table.name} SELECT * FROM full.{table.name}{where}")
+    single = main.collect_report()
+
+    assert "exception_result" in single
+    assert json.dumps(reports["user1"], default=json_default, sort_keys=True) == \
+        json.dumps(single, default=json_default, sort_keys=True)
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+from sqlalchemy import insert, select
+
+import main
+from database.conn import DBManager
+from database.seed import seed
+from database.shard import merge_partials, merge_union
+from model.models import Base
+from ppt_generator.backends import json_default
+
+# A sharded run over three SQLite shards must report exactly what one database
+# holding all of their rows reports. The shards are seeded with different seeds
+# from the same md5 pool, so duplicate groups span shards.
+
+SHARDS = 3
+
+@pytest.fixture(scope="module")
+def databases(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("shards")
+    shard_urls = [f"sqlite:///{directory / f'shard{n}.db'}" for n in range(SHARDS)]
+    for n, url in enumerate(shard_urls):
+        seed(url, jobs=300, users=3, days=60, seed_value=n + 1)
+
+    # The union database gets the shards' rows as seeded, with fresh surrogate ids
+    union_url = f"sqlite:///{directory / 'union.db'}"
+    union = DBManager(union_url)
+    Base.metadata.create_all(union.engine)
+    with union.engine.begin() as target:
+        for n, url in enumerate(shard_urls):
+            with DBManager(url).engine.connect() as source:
+                for table in Base.metadata.sorted_tables:
+                    if table.name == "status" and n > 0:
+                        continue
+                    columns = [column for column in table.columns if column.name != "id" or table.name == "status"]
+                    rows = [dict(row._mapping) for row in source.execute(select(*columns))]
+                    if rows:
+                        target.execute(insert(table), rows)
+    return union_url, shard_urls, directory
+
+def report_json(use_database, connection, store_path, **options):
+    use_database(connection, store_path)
+    report = main.collect_report(**options)
+    return json.dumps(report, default=json_default, sort_keys=True)
+
+@pytest.mark.parametrize("options", [{}, {"batch": True}, {"by_user": True}])
+def test_sharded_report_matches_single_database(databases, monkeypatch, use_database, options):
+    union_url, shard_urls, directory = databases
+    monkeypatch.setattr(main, "DUPLICATE_APPENDIX_GROUPS", 25)
+    single = report_json(use_database, union_url, directory / "single_store.db", **options)
+    sharded = report_json(use_database, shard_urls, directory / "sharded_store.db", **options)
+    assert sharded == single
+    assert '"duplicate_hashes"' in single
+
+@pytest.mark.parametrize("snapshot", [10000, 10, 0])
+def test_sharded_duplicate_pages_match_single_database(databases, monkeypatch, use_database, snapshot):
+    # Pages come from the counts snapshot, then from the keyset query past its end
+    union_url, shard_urls, directory = databases
+    monkeypatch.setattr(main, "DUPLICATE_PAGE_SNAPSHOT", snapshot)
+
+    def pages(connection):
+        use_database(connection, directory / "pages_store.db")
+        counts = main.duplicate_hash_counts() if snapshot else None
+        records, after = [], None
+        while True:
+            frame, after = main.duplicate_hash_page(after, 7, counts)
+            records += frame.to_records()
+            if after is None:
+                return counts, records
+
+    def streamed(connection):
+        use_database(connection, directory / "pages_store.db")
+        return [record for frame in main.iter_duplicate_hashes(page_size=50) for record in frame.to_records()]
+
+    single_counts, single_pages = pages(union_url)
+    sharded_counts, sharded_pages = pages(shard_urls)
+    assert sharded_counts == single_counts
+    assert len(single_counts or []) == min(snapshot, len(single_pages))
+    assert sharded_pages == single_pages
+    assert streamed(shard_urls) == streamed(union_url) == single_pages
+    assert len({record["MD5"] for record in single_pages}) == len(single_pages) > 10
+
+def test_merge_union_keeps_values_with_commas():
+    assert merge_union(["a,b", "c"], ["c", "d"]) == ["a,b", "c", "d"]
+    assert merge_union(None, ["x"]) == ["x"]
+    rows = merge_partials([[("m1", 1, ["a,b"])], [("m1", 2, ["c"])]], 1, ("sum", "union"))
+    assert rows == [("m1", 3, ["a,b", "c"])]